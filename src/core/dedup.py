@@ -0,0 +1,31 @@
+﻿from typing import Hashable, List, Tuple
+
+
+def first_occurrences(keys: List[Hashable]) -> Tuple[List[int], List[int]]:
+    """Номера первых вхождений ключей и номера повторов (в исходном порядке)"""
+    seen = set()
+    unique, duplicates = [], []
+    for i, key in enumerate(keys):
+        if key in seen:
+            duplicates.append(i)
+        else:
+            seen.add(key)
+            unique.append(i)
+    return unique, duplicates
+
+
+def deduplicate(candidates: list, canonical: list) -> Tuple[list, list]:
+    """
+    Делит кандидатов на уникальные особи и повторы по ключу хромосомы. Особи интернируются:
+    одинаковым хромосомам соответствует один объект - особь из canonical, если она там есть,
+    иначе первое вхождение среди кандидатов. Уникальные особи идут в порядке первых вхождений
+    """
+    table = {}
+    for ind in canonical:
+        table.setdefault(ind.key, ind)
+    keys = [ind.key for ind in candidates]
+    for key, ind in zip(keys, candidates):
+        table.setdefault(key, ind)
+
+    unique, duplicates = first_occurrences(keys)
+    return [table[keys[i]] for i in unique], [table[keys[i]] for i in duplicates]
@@ -0,0 +1,187 @@
+﻿import time
+from modules.graph import Graph
+from modules.parameters import Parameters
+from modules.individual import Individual
+from modules.population import Population
+from modules.bitset import indices_to_mask, from_mask
+from typing import List, Tuple
+
+
+class ExactSolver:
+    """
+    Точный поиск максимальной клики методом ветвей и границ (MCQ Томиты) на битовых масках.
+    Вершины берутся в порядке transform_by_degree, верхняя граница в узле дерева поиска -
+    число цветов жадной раскраски кандидатов. Интерфейс совпадает с GeneticAlgorithm:
+    next_generation обходит до exact_step_nodes узлов, поэтому AlgorithmManager управляет
+    решателем как обычным алгоритмом. При исчерпании exact_node_limit или exact_time_limit
+    поиск останавливается с лучшей найденной кликой
+    """
+
+    def __init__(self, graph: Graph, params: Parameters):
+        self.graph = graph
+        self.params = params
+        self.n = graph.n
+
+        graph.set_backend(params.graph_backend)
+        if not graph.is_transformed():
+            graph.transform_by_degree()
+        self.upper_bound = graph.clique_upper_bound()
+
+        # Соседи вершин в виде битовых масок (без петель) нужны при любом способе хранения графа
+        if graph.transformed_bits:
+            self.bits = list(graph.transformed_bits)
+        else:
+            self.bits = [indices_to_mask((u for u in adj if u != v), self.n)
+                         for v, adj in enumerate(graph.transformed_adj)]
+
+        # Состояние поиска
+        self.generation = 0             # Количество выполненных шагов
+        self.stagnation_count = 0       # Счетчик шагов без улучшения
+        self.nodes = 0                  # Количество обойденных узлов дерева поиска
+        self.elapsed = 0.0              # Время поиска (в секундах)
+        self.proved_optimal = False     # Поиск завершен: найденная клика максимальна
+        self.limit_reached = False      # Поиск прерван по ограничению узлов или времени
+
+        # Начальное решение - жадная клика из вершины наибольшей степени
+        self._set_best(self.greedy_clique())
+
+        # Стек поиска: [клика, ее размер, кандидаты, порядок ветвления, цвета]
+        candidates = (1 << self.n) - 1
+        order, colours = self.colour_sort(candidates, self.best_fitness + 1)
+        self.stack = [[0, 0, candidates, order, colours]]
+        self._check_finished()
+
+
+    def greedy_clique(self) -> int:
+        """Жадная клика: к вершине 0 добавляются общие соседи в порядке убывания степени"""
+        if self.n == 0:
+            return 0
+        clique = 1
+        candidates = self.bits[0]
+        while candidates:
+            low = candidates & -candidates
+            clique |= low
+            candidates &= self.bits[low.bit_length() - 1]
+        return clique
+
+
+    def _set_best(self, clique: int):
+        """Запоминает новую лучшую клику"""
+        self.best_bits = clique
+        self.best_fitness = clique.bit_count()
+        self.best_chromosome = from_mask(clique, self.n)
+        self.population = Population([Individual.from_bits(clique, self.n)])
+
+
+    def colour_sort(self, candidates: int, min_colour: int) -> Tuple[List[int], List[int]]:
+        """
+        Жадная раскраска кандидатов: каждый цвет - независимое множество, вершины
+        берутся по возрастанию номера. Возвращает вершины с цветом не меньше
+        min_colour и их цвета по неубыванию (вершины с меньшим цветом не улучшат клику)
+        """
+        bits = self.bits
+        order = []
+        colours = []
+        uncoloured = candidates
+        colour = 0
+        while uncoloured:
+            colour += 1
+            available = uncoloured
+            while available:
+                low = available & -available
+                v = low.bit_length() - 1
+                available &= ~bits[v]
+                available ^= low
+                uncoloured ^= low
+                if colour >= min_colour:
+                    order.append(v)
+                    colours.append(colour)
+        return order, colours
+
+
+    def _search(self, budget: int):
+        """Обходит до budget узлов дерева поиска, продолжая с сохраненного стека"""
+        bits = self.bits
+        stack = self.stack
+        best = self.best_fitness
+        best_clique = None
+        expanded = 0
+        while stack and expanded < budget:
+            frame = stack[-1]
+            clique, size, candidates, order, colours = frame
+            # Цвета не убывают, поэтому при первой неудаче отсекаются все оставшиеся вершины
+            if not order or size + colours[-1] <= best:
+                stack.pop()
+                continue
+
+            v = order.pop()
+            colours.pop()
+            low = 1 << v
+            frame[2] = candidates ^ low     # Вершина v больше не кандидат в этом узле
+            expanded += 1
+
+            new_clique = clique | low
+            new_candidates = candidates & bits[v]
+            if not new_candidates:
+                if size + 1 > best:
+                    best = size + 1
+                    best_clique = new_clique
+                continue
+            new_order, new_colours = self.colour_sort(new_candidates, best - size)
+            if new_order:
+                stack.append([new_clique, size + 1, new_candidates, new_order, new_colours])
+
+        self.nodes += expanded
+        if best_clique is not None:
+            self._set_best(best_clique)
+
+
+    def _check_finished(self):
+        """Проверяет, доказана ли оптимальность или исчерпаны ограничения поиска"""
+        if not self.stack or self.best_fitness >= self.upper_bound:
+            self.stack = []
+            self.proved_optimal = True
+        elif ((self.params.exact_node_limit and self.nodes >= self.params.exact_node_limit) or
+              (self.params.exact_time_limit and self.elapsed >= self.params.exact_time_limit)):
+            self.limit_reached = True
+
+
+    def next_generation(self):
+        """Выполняет один шаг поиска - не более exact_step_nodes узлов"""
+        budget = self.params.exact_step_nodes
+        if self.params.exact_node_limit:
+            budget = min(budget, self.params.exact_node_limit - self.nodes)
+
+        previous = self.best_fitness
+        start = time.perf_counter()
+        self._search(budget)
+        self.elapsed += time.perf_counter() - start
+        self.generation += 1
+        self.stagnation_count = 0 if self.best_fitness > previous else self.stagnation_count + 1
+        self._check_finished()
+
+
+    def should_stop(self) -> bool:
+        """Поиск останавливается после доказательства оптимальности или по ограничениям"""
+        return self.proved_optimal or self.limit_reached
+
+
+    def solve(self) -> List[int]:
+        """Выполняет поиск до завершения и возвращает лучшую клику в исходной нумерации"""
+        while not self.should_stop():
+            self.next_generation()
+        return self.get_best_solution()
+
+
+    def get_population_chromosomes(self) -> List[List[int]]:
+        """Популяция решателя - лучшая найденная клика"""
+        return [self.get_best_solution()]
+
+
+    def get_best_solution(self) -> List[int]:
+        """Возвращает лучшую клику в исходной нумерации вершин"""
+        return self.graph.transform_to_original(self.best_chromosome)
+
+
+    def close(self):
+        """Решатель не держит внешних ресурсов"""
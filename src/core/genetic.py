@@ -1,16 +1,84 @@
 ﻿import random
+import numpy as np
+from bisect import bisect
+from itertools import accumulate
 from modules.graph import Graph
 from modules.parameters import Parameters
-from modules.individual import Individual
+from modules.individual import Individual, SparseIndividual
 from modules.population import Population
+from modules.bitset import to_mask, from_mask, bit_indices, segment_mask
+from core.sampler import DegreeSampler
+from core.selection import NUMPY_THRESHOLD, select_indices, scale_weights_list
+from core.parallel import OffspringPool
+from core.local_search import LocalSearch
+from core.dedup import deduplicate
+from core.repair_cache import RepairCache
+from core.survival import RestrictedTournament
+from core.mutation import flip_count, flip_positions
 from typing import List, Tuple
 
 
 class GeneticAlgorithm:
     def __init__(self, graph: Graph,  params:Parameters):
         """Инициализация генетического алгоритма для поиска максимальной клики"""
+        self._setup(graph, params)
+        
+        # Генерация начальной популяции
+        self.population = Population(self.generate_initial_population())
+        self._update_best_solution()    # Обновление лучшего решения
+        
+        # Пул процессов для параллельного получения потомков
+        self.offspring_pool = self._create_offspring_pool()
+        if self.offspring_pool is not None:
+            # Кэш в каждом процессе пула сделал бы результат зависимым от числа процессов
+            self.repair_cache = None
+        
+
+    def to_full_bits(self, bits: int) -> int:
+        """Переводит маску особи из нумерации рабочего графа в нумерацию полного графа"""
+        if self.full_index is None:
+            return bits
+        full_index = self.full_index
+        return sum(1 << full_index[v] for v in bit_indices(bits))
+
+
+    def from_full_bits(self, bits: int) -> int:
+        """Переводит маску из нумерации полного графа в рабочий граф (удаленные вершины отбрасываются)"""
+        if self.full_index is None:
+            return bits
+        work_index = self.work_index
+        return sum(1 << work_index[v] for v in bit_indices(bits) if v in work_index)
+
+
+    def individual_from_bits(self, bits: int) -> Individual:
+        """Особь по маске рабочего графа в представлении текущего режима хромосом"""
+        cls = SparseIndividual if self.sparse else Individual
+        return cls.from_bits(bits, self.n)
+
+
+    def to_full_chromosome(self, individual: Individual) -> List[int]:
+        """Хромосома особи в нумерации полного графа"""
+        if self.full_index is None:
+            return individual.chromosome
+        return from_mask(self.to_full_bits(individual.bits), self.full_graph.n)
+
+
+    def to_original_chromosome(self, individual: Individual) -> List[int]:
+        """Хромосома особи в исходной нумерации вершин"""
+        if self.sparse:
+            vertices = individual.vertices
+            if self.full_index is not None:
+                vertices = [self.full_index[v] for v in vertices]
+            return self.full_graph.vertices_to_original(vertices)
+        return self.full_graph.transform_to_original(self.to_full_chromosome(individual))
+
+
+    def _setup(self, graph: Graph, params: Parameters):
+        """Задает параметры, состояние алгоритма и подготавливает граф"""
         self.graph = graph
         self.params = params
+        # Свой генератор случайных чисел: зерно не сбрасывает общий модуль random (им пользуется GUI)
+        self.rng = random.Random(params.seed)
         
         # Текущие значения параметров
         self.current_mutation_prob_chrom = params.max_mutation_prob_chrom   # Вероятность мутации хромосомы
@@ -21,16 +89,82 @@ class GeneticAlgorithm:
         self.generation = 0             # Текущее поколение
         self.stagnation_count = 0       # Счетчик поколений без улучшения
         self.best_fitness = 0           # Лучшая найденная приспособленность
+        self.duplicate_count = 0        # Повторяющиеся хромосомы среди кандидатов последнего отбора
+        self.duplicate_rate = 0.0       # Их доля среди кандидатов (близка к 1 - популяция выродилась)
         self.best_chromosome = None     # Лучшая найденная хромосома
         
         # Инициализация графа
         self.n = graph.n                # Количество вершин в графе
-        self.max_degree_original = max(len(adj) for adj in graph.adj_list)   # Максимальная степень вершины
-        graph.transform_by_degree()     # Преобразование графа по степеням вершин
-        
-        # Генерация начальной популяции
-        self.population = Population(self.generate_initial_population())
-        self._update_best_solution()    # Обновление лучшего решения
+        self.full_graph = graph         # Полный граф: лучшее решение хранится в его нумерации
+        self.full_index = None          # Вершины полного графа для вершин рабочего графа (None - граф не сокращался)
+        self.offspring_pool = None      # Пул процессов (создается после начальной популяции)
+        self.sparse = params.chromosome_mode == 'sparse'   # Хромосомы - списки номеров вершин
+        self._first_cum_weights = None  # Накопленные веса первой вершины клики в разреженном режиме
+        self._degrees = None            # Степени вершин рабочего графа в разреженном режиме
+        self.local_search = LocalSearch(params.local_search_tabu, self.rng)   # Локальный поиск (счетчики за весь запуск)
+        self.repair_cache = (RepairCache(params.repair_cache_size, params.repair_cache_ties)
+                             if params.repair_cache_size > 0 else None)    # Кэш восстановления (None - без кэша)
+        self.survival = (RestrictedTournament(params.rtr_window, self.rng)
+                         if params.survival_method == 'rtr' else None)      # Ограниченный турнир (None - отбор maxmin)
+        graph.set_backend(params.graph_backend)     # Выбор способа хранения графа
+        if not graph.is_transformed():
+            graph.transform_by_degree() # Преобразование графа по степеням вершин
+        self._upper_bound = None        # Верхняя граница размера клики (вычисляется при первой проверке)
+        self._np_rng = None             # Генератор NumPy (создается при первом обращении)
+
+
+    @property
+    def upper_bound(self) -> int:
+        """
+        Верхняя граница размера клики (Graph.clique_upper_bound полного графа).
+        Нужна только для остановки, поэтому вычисляется при первом обращении, а не при инициализации
+        """
+        if self._upper_bound is None:
+            self._upper_bound = self.full_graph.clique_upper_bound()
+        return self._upper_bound
+
+
+    @upper_bound.setter
+    def upper_bound(self, value: int):
+        self._upper_bound = value
+
+
+    @property
+    def np_rng(self) -> np.random.Generator:
+        """
+        Генератор NumPy для векторных операций. Зерно берется из self.rng при первом обращении,
+        поэтому seed управляет обоими генераторами, а запуски без NumPy не расходуют числа rng
+        """
+        if self._np_rng is None:
+            self._np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        return self._np_rng
+
+
+    @np_rng.setter
+    def np_rng(self, value: np.random.Generator):
+        self._np_rng = value
+
+
+    def _create_offspring_pool(self):
+        """Создает пул процессов, если в параметрах задано число процессов-исполнителей"""
+        if self.params.parallel_workers > 0:
+            return OffspringPool(self, self.params.parallel_workers)
+        return None
+
+
+    @classmethod
+    def replica(cls, graph: Graph, params: Parameters) -> 'GeneticAlgorithm':
+        """Создает алгоритм без популяции - только операторы (для процессов-исполнителей)"""
+        algorithm = cls.__new__(cls)
+        algorithm._setup(graph, params)
+        algorithm.repair_cache = None   # Потомки пары не должны зависеть от того, какой процесс ее получил
+        return algorithm
+
+
+    @property
+    def sampler(self) -> DegreeSampler:
+        """Выбор вершин для клик с весами по степеням (строится один раз на граф)"""
+        return DegreeSampler.for_graph(self.graph, self.params.fitness_scaling_percent)
 
 
     def scale_weights(self, weights: List[float]) -> List[float]:
@@ -38,19 +172,7 @@ class GeneticAlgorithm:
         Масштабирует веса так, чтобы максимальный вес был не более
         чем на scaling_percent больше минимального.
         """
-        if not weights:
-            return []
-            
-        w_min = min(weights)
-        w_max = max(weights)
-        
-        # Если все веса равны, возвращаем единицы
-        if w_min == w_max:
-            return [1.0] * len(weights)
-        
-        # Вычисляем масштабированные веса
-        K = self.params.fitness_scaling_percent / 100.0
-        return [1 + K * (w - w_min) / (w_max - w_min) for w in weights]
+        return scale_weights_list(weights, self.params.fitness_scaling_percent)
 
 
     def generate_chromosome(self) -> List[int]:
@@ -59,109 +181,323 @@ class GeneticAlgorithm:
         if self.n == 0:
             return []
         
-        degrees = [len(adj) for adj in self.graph.transformed_adj] # Степени вершин в отсортированном графе
-        available = list(range(self.n))                            # Список номеров доступных вершин для добавления в клику
-        weights = self.scale_weights(degrees)                      # Веса вершин для случайного выбора
-        chosen = random.choices(available, weights=weights)[0]     # Случайно выбираем первую вершину для клики
-        current_clique = [chosen]                                  # Теперь текущая клика состоит из этой ершины
-        candidates = set(self.graph.transformed_adj[chosen])       # Множество кандидатов для добавления в клику
-        
-        # Расширяем клику, пока есть кандидаты
-        while candidates:
-            cand_list = list(candidates)                            
-            cand_weights = self.scale_weights([degrees[c] for c in cand_list])  # Список весов для случайного выбора среди кандидатов
-            next_vertex = random.choices(cand_list, weights=cand_weights)[0]    # Случайно выбираем следующщую вершину
-            current_clique.append(next_vertex)                                  # Добавляем ее в клику
-            candidates.discard(next_vertex)                                     # Удаляем ее из кандидатов
-            candidates = candidates & self.graph.transformed_adj[next_vertex]   # Обновляем возможных кандидатов для добавления в клику
-        
-        # Заполняем хромосому в соответствие с выбранными для клики вершинами
-        chromosome = [0] * self.n
-        for v in current_clique:
-            chromosome[v] = 1
-        return chromosome
+        # Вершины выбираются с весами по степеням, см. DegreeSampler
+        return self.sampler.sample(1, self.rng)[0].view(np.uint8).tolist()
 
 
     def generate_initial_population(self) -> List[Individual]:
-        """Генерирует начальную популяцию особей"""
-        return [Individual(self.generate_chromosome()) for _ in range(self.params.population_size)]
+        """Генерирует начальную популяцию особей за один проход выборщика"""
+        if self.sparse:
+            return [SparseIndividual(self.sparse_extend([]), self.n)
+                    for _ in range(self.params.population_size)]
+        cliques = self.sampler.sample(self.params.population_size, self.rng)
+        return [Individual(row) for row in cliques.view(np.uint8)]
 
 
     def select_parents(self) -> List[Individual]:
-        """Выбирает родителей для скрещивания с использованием метода рулетки"""
-        # Масштабируем рулетку
+        """Выбирает родителей для скрещивания методом, заданным в параметрах (по умолчанию - рулеткой)"""
         fitnesses = self.population.get_fitnesses()
-        scaled = self.scale_weights(fitnesses)
+        # Генератор NumPy нужен только рулетке больших популяций
+        np_rng = (self.np_rng if self.params.selection_method == 'roulette' and len(fitnesses) >= NUMPY_THRESHOLD
+                  else None)
+        indices = select_indices(fitnesses,
+                                 self.params.population_size,
+                                 self.params.selection_method,
+                                 self.params.fitness_scaling_percent,
+                                 self.rng,
+                                 self.params.tournament_size,
+                                 np_rng)
             
         # Возвращаем список родителей для новой популяции
-        return random.choices(self.population.individuals, 
-                              weights=scaled, 
-                              k=self.params.population_size)
+        return [self.population.individuals[i] for i in indices]
 
 
     def crossover(self, parent1: Individual, parent2: Individual) -> Tuple[List[int], List[int]]:
-        """Выполняет кроссовер двух родителей с несколькими точками разрыва"""
-        breaks = self.current_crossover_points
-        chrom1 = parent1.chromosome
-        chrom2 = parent2.chromosome
-        
+        """Выполняет кроссовер двух родителей методом, заданным в параметрах"""
+        if self.params.crossover_method == 'intersection':
+            return self.intersection_crossover(parent1, parent2)
+        if self.params.crossover_method == 'union':
+            return self.union_crossover(parent1, parent2)
+        return self.multipoint_crossover(parent1, parent2)
+
+
+    def intersection_crossover(self, parent1: Individual, parent2: Individual) -> Tuple[List[int], List[int]]:
+        """
+        Общие вершины родителей - клика; каждый потомок дополняет ее общими соседями
+        с весами по степеням, поэтому потомки без мутации не требуют восстановления
+        """
+        if self.n == 0:
+            return [], []
+        common = parent1.bits & parent2.bits
+        sampler = self.sampler
+        return (from_mask(sampler.extend_mask(common, self.rng), self.n),
+                from_mask(sampler.extend_mask(common, self.rng), self.n))
+
+
+    def union_crossover(self, parent1: Individual, parent2: Individual) -> Tuple[List[int], List[int]]:
+        """
+        Объединение вершин родителей: восстановление удаляет вершины с наименьшей степенью
+        в подграфе, случайный выбор среди равных дает потомкам разные клики
+        """
+        union = from_mask(parent1.bits | parent2.bits, self.n)
+        return union, union[:]
+
+
+    def multipoint_crossover(self, parent1: Individual, parent2: Individual) -> Tuple[List[int], List[int]]:
+        """
+        Выполняет кроссовер двух родителей с несколькими точками разрыва.
+        Сегменты чередуются по одной маске пары: потомок получает гены своего родителя
+        вне маски и гены другого родителя в маске
+        """
         # Если разрывов нет - возвращаем копии родителей
         if self.n <= 1:
-            return chrom1[:], chrom2[:]
+            return parent1.chromosome, parent2.chromosome
         
         # Выбираем точки разрыва
-        breaks = min(breaks, self.n - 1)
-        break_points = sorted(random.sample(range(1, self.n), k=breaks))
+        breaks = min(self.current_crossover_points, self.n - 1)
+        break_points = sorted(self.rng.sample(range(1, self.n), k=breaks))
         
-        # Строим потомков
-        child1, child2 = [], []
-        current = 0
-        
-        # Попеременное копирование сегментов от родителей
-        for i, point in enumerate(break_points):
-            if i % 2 == 0:
-                child1.extend(chrom1[current:point])
-                child2.extend(chrom2[current:point])
-            else:
-                child1.extend(chrom2[current:point])
-                child2.extend(chrom1[current:point])
-            current = point
-        
-        # Добавляем остаток хромосомы
-        if len(break_points) % 2 == 0:
-            child1.extend(chrom1[current:])
-            child2.extend(chrom2[current:])
-        else:
-            child1.extend(chrom2[current:])
-            child2.extend(chrom1[current:])
-            
-        return child1, child2
+        # Гены, в которых родители различаются и которые потомки меняют местами
+        bits1, bits2 = parent1.bits, parent2.bits
+        swapped = (bits1 ^ bits2) & segment_mask(break_points, self.n)
+        return from_mask(bits1 ^ swapped, self.n), from_mask(bits2 ^ swapped, self.n)
 
 
     def mutate_and_repair(self, chromosome: List[int]) -> List[int]:
         """Применяет мутацию и восстанавливает хромосому до валидной клики"""
-        if random.random() < self.current_mutation_prob_chrom:
-            mutated = [
-                # Инвертируем ген с вероятностью current_mutation_prob_gene
-                1 - gene if random.random() < self.current_mutation_prob_gene else gene 
-                for gene in chromosome
-            ]
+        if self.rng.random() < self.current_mutation_prob_chrom:
+            mutated = self.mutate(chromosome)
         else:
             mutated = chromosome    # Без мутации
         
-        # Восстанавливаем до клики
-        return self.graph.repair_chromosome(mutated)
+        # Восстанавливаем до клики; немутировавший потомок ищется в кэше
+        if self.repair_cache is not None and (mutated is chromosome or mutated == chromosome):
+            repaired = self.cached_repair(mutated)
+        else:
+            repaired = self.graph.repair_chromosome(mutated, self.rng)
+        if self.params.greedy_extension:
+            return self.extend_to_maximal(repaired)
+        return repaired
+
+
+    def cached_repair_bits(self, bits: int) -> int:
+        """Восстанавливает клику по маске хромосомы через кэш восстановления"""
+        repaired = self.repair_cache.get(bits)
+        if repaired is None:
+            ties = []
+            repaired = bits
+            for v in self.graph.vertices_to_remove(bit_indices(bits), ties, self.rng):
+                repaired ^= 1 << v
+            self.repair_cache.put(bits, repaired, any(count > 1 for count in ties))
+        return repaired
+
+
+    def cached_repair(self, chromosome: List[int]) -> List[int]:
+        """Восстанавливает хромосому как repair_chromosome, но через кэш восстановления"""
+        return from_mask(self.cached_repair_bits(to_mask(chromosome)), self.n)
+
+
+    def sparse_extend(self, vertices) -> List[int]:
+        """
+        Дополняет клику (номера вершин) общими соседями с весами по степеням, как generate_chromosome,
+        но на множествах соседей: время зависит от степеней вершин клики, а не от числа вершин графа.
+        Пустая клика начинается с вершины, выбранной по степеням среди всех вершин
+        """
+        graph = self.graph
+        if self._degrees is None:
+            self._degrees = graph.transformed_degrees()
+        degrees = self._degrees
+        clique = list(vertices)
+        if not clique:
+            if self.n == 0:
+                return []
+            if self._first_cum_weights is None:
+                self._first_cum_weights = list(accumulate(self.scale_weights(degrees)))
+            clique.append(self.rng.choices(range(self.n), cum_weights=self._first_cum_weights, k=1)[0])
+
+        candidates = graph.common_neighbors(clique)
+        candidates.difference_update(clique)
+
+        while candidates:
+            vertices = sorted(candidates)
+            weights = self.scale_weights([degrees[u] for u in vertices])
+            v = self.rng.choices(vertices, weights=weights, k=1)[0]
+            clique.append(v)
+            candidates = graph.common_neighbors([v], candidates)
+            candidates.discard(v)
+        return sorted(clique)
+
+
+    def sparse_crossover(self, parent1: Individual, parent2: Individual) -> Tuple[List[int], List[int]]:
+        """
+        Кроссовер по номерам вершин. Многоточечный кроссовер совпадает с crossover:
+        вершина берется от своего родителя, если перед ней четное число точек разрыва
+        """
+        vertices1 = parent1.vertices
+        vertices2 = parent2.vertices
+        method = self.params.crossover_method
+        if method == 'intersection':
+            common = set(vertices1).intersection(vertices2)
+            return self.sparse_extend(common), self.sparse_extend(common)
+        if method == 'union':
+            union = sorted(set(vertices1).union(vertices2))
+            return union, union[:]
+
+        if self.n <= 1:
+            return list(vertices1), list(vertices2)
+        breaks = min(self.current_crossover_points, self.n - 1)
+        points = sorted(self.rng.sample(range(1, self.n), k=breaks))
+        own1 = [bisect(points, v) % 2 == 0 for v in vertices1]
+        own2 = [bisect(points, v) % 2 == 0 for v in vertices2]
+        child1 = [v for v, own in zip(vertices1, own1) if own] + [v for v, own in zip(vertices2, own2) if not own]
+        child2 = [v for v, own in zip(vertices2, own2) if own] + [v for v, own in zip(vertices1, own1) if not own]
+        return sorted(child1), sorted(child2)
+
+
+    def sparse_mutate_and_repair(self, vertices: List[int]) -> List[int]:
+        """Мутация и восстановление по номерам вершин (как mutate_and_repair)"""
+        if self.rng.random() < self.current_mutation_prob_chrom:
+            p = self.current_mutation_prob_gene
+            if self.params.mutation_method == 'neighbourhood':
+                removals = flip_count(len(vertices), p, self.rng)
+                additions = flip_count(self.n - len(vertices), p, self.rng)
+                vertices = self.sparse_neighbourhood_mutation(vertices, removals, additions)
+            else:
+                # Инвертируются только разыгранные номера генов
+                vertices = sorted(set(vertices).symmetric_difference(flip_positions(self.n, p, self.rng)))
+
+        removed = set(self.graph.vertices_to_remove(vertices, rng=self.rng))
+        repaired = [v for v in vertices if v not in removed]
+        if self.params.greedy_extension:
+            return self.sparse_extend(repaired)
+        return repaired
+
+
+    def mutate(self, chromosome: List[int]) -> List[int]:
+        """Мутирует хромосому методом, заданным в параметрах"""
+        p = self.current_mutation_prob_gene
+        if self.params.mutation_method == 'neighbourhood':
+            bits = to_mask(chromosome)
+            size = bits.bit_count()
+            removals = flip_count(size, p, self.rng)
+            additions = flip_count(self.n - size, p, self.rng)
+            return from_mask(self.neighbourhood_mutation(bits, removals, additions), self.n)
+
+        # Каждый ген инвертируется с вероятностью current_mutation_prob_gene;
+        # разыгрываются только номера инвертируемых генов
+        mutated = list(chromosome)
+        for i in flip_positions(len(mutated), p, self.rng):
+            mutated[i] = 1 - mutated[i]
+        return mutated
+
+
+    def neighbourhood_mutation(self, bits: int, removals: int, additions: int) -> int:
+        """
+        Мутация с учетом соседства: удаляет removals случайных вершин хромосомы и добавляет
+        до additions вершин, смежных всем оставшимся вершинам, а если таких не хватает -
+        всем, кроме одной. Количества инверсий разыгрываются с той же вероятностью гена,
+        что и при обычной мутации, но добавленные вершины почти не требуют восстановления
+        """
+        members = bit_indices(bits)
+        for v in self.rng.sample(members, removals):
+            bits ^= 1 << v
+        if not additions:
+            return bits
+
+        masks = self.sampler.masks
+        members = bit_indices(bits)
+        common = (1 << self.n) - 1
+        for v in members:
+            common &= masks[v]
+        candidates = bit_indices(common)
+        if len(candidates) < additions:
+            near = 0
+            for _, missing in LocalSearch.one_missing(members, masks, bits, self.n):
+                near |= missing
+            candidates += bit_indices(near)
+
+        for v in self.rng.sample(candidates, min(additions, len(candidates))):
+            bits |= 1 << v
+        return bits
+
+
+    def sparse_neighbourhood_mutation(self, vertices: List[int], removals: int, additions: int) -> List[int]:
+        """
+        Мутация с учетом соседства по номерам вершин (как neighbourhood_mutation): кандидаты
+        ищутся по соседям графа, а не по маскам длины n, поэтому память не растет как n^2
+        """
+        removed = set(self.rng.sample(sorted(vertices), removals))
+        members = sorted(v for v in vertices if v not in removed)
+        if not additions:
+            return members
+
+        clique = set(members)
+        if members:
+            candidates = sorted(self.graph.common_neighbors(members) - clique)
+        else:
+            candidates = list(range(self.n))
+        if len(candidates) < additions:
+            near = set()
+            for _, missing in LocalSearch.one_missing_sparse(members, self.graph, clique):
+                near |= missing
+            candidates += sorted(near)
+
+        clique.update(self.rng.sample(candidates, min(additions, len(candidates))))
+        return sorted(clique)
+
+
+    def extend_to_maximal(self, chromosome: List[int]) -> List[int]:
+        """Дополняет клику общими соседями с весами по степеням, пока она не станет максимальной"""
+        if self.n == 0:
+            return chromosome
+        return from_mask(self.sampler.extend_mask(to_mask(chromosome), self.rng), self.n)
     
 
-    def _hamming_distance(self, chrom1, chrom2):
-        """Вычисляет нормализованное расстояние Хэмминга между двумя хромосомами"""
-        matches = sum(g1 == g2 for g1, g2 in zip(chrom1, chrom2))
-        return 1.0 - matches / len(chrom1)
+    def local_search_phase(self, offspring: List[Individual]) -> None:
+        """Меметическая фаза: улучшает локальным поиском local_search_elite лучших потомков на месте"""
+        if self.n == 0 or not offspring:
+            return
+        elite = sorted(range(len(offspring)), key=lambda i: offspring[i].fitness, reverse=True)
+        elite = elite[:self.params.local_search_elite]
+        moves = max(1, self.params.local_search_moves // len(elite))   # Бюджет поколения делится поровну
+        if self.sparse:
+            # Без масок соседей: в разреженном режиме они заняли бы память порядка n^2
+            for i in elite:
+                vertices = self.local_search.improve_sparse(offspring[i].vertices, self.graph, moves)
+                if tuple(vertices) != offspring[i].vertices:
+                    offspring[i] = SparseIndividual(vertices, self.n)
+            return
+        masks = self.sampler.masks
+        for i in elite:
+            bits = self.local_search.improve(offspring[i].bits, masks, self.n, moves)
+            if bits != offspring[i].bits:
+                offspring[i] = type(offspring[i]).from_bits(bits, self.n)
+
+
+    def _hamming_distance(self, ind1: Individual, ind2: Individual) -> float:
+        """Вычисляет нормализованное расстояние Хэмминга между хромосомами двух особей"""
+        if self.sparse:
+            return len(set(ind1.vertices).symmetric_difference(ind2.vertices)) / ind1.n
+        return (ind1.bits ^ ind2.bits).bit_count() / ind1.n
 
 
     def select_new_population(self, current_pop: List[Individual], offspring: List[Individual]) -> List[Individual]:
-        """Формирует новую популяцию, сохраняя разнообразие"""
+        """
+        Формирует новую популяцию, сохраняя разнообразие. Повторяющиеся хромосомы
+        считаются всегда, а при deduplicate исключаются из отбора: популяция дополняется
+        повторами (общими объектами особей), только если различных особей не хватает
+        """
         combined = offspring + current_pop
+        unique, duplicates = deduplicate(combined, current_pop)
+        self.duplicate_count = len(duplicates)
+        self.duplicate_rate = len(duplicates) / len(combined) if combined else 0.0
+        if self.survival is not None:
+            # Ограниченный турнир: потомки замещают ближайших особей, попарных расстояний нет
+            chosen = self.survival.select([ind.bits for ind in combined], [ind.fitness for ind in combined],
+                                          len(offspring), self.params.population_size, self.params.deduplicate)
+            return [combined[i] for i in chosen]
+        if self.params.deduplicate:
+            combined = unique
         combined.sort(key=lambda ind: ind.fitness, reverse=True)
         
         selected = []                   # Выбранные особи
@@ -173,41 +509,38 @@ class GeneticAlgorithm:
             best_candidates = [ind for ind in remaining if ind.fitness == max_fitness]
         
             # Случайно выбираем одну из лучших
-            best = random.choice(best_candidates)
+            best = self.rng.choice(best_candidates)
             remaining.remove(best)
             selected.append(best)
         
+        # Минимальное расстояние от каждой оставшейся особи до уже выбранных.
+        # Обновляется только относительно последней выбранной особи
+        min_distances = [self._hamming_distance(ind, selected[-1]) for ind in remaining]
+        
         # Добавляем особи, максимально отличающиеся от уже выбранных
         while len(selected) < self.params.population_size and remaining:
-            best_candidates = []
-            max_min_distance = -1
-            
-            for ind in remaining:
-                # Вычисляем минимальное расстояние до уже выбранных особей
-                min_distance = min(
-                    self._hamming_distance(ind.chromosome, sel.chromosome)
-                    for sel in selected
-                ) if selected else 1.0
-                
-                if min_distance > max_min_distance:
-                    max_min_distance = min_distance
-                    best_candidates = [ind]
-                elif min_distance == max_min_distance:
-                    best_candidates.append(ind)
+            max_min_distance = max(min_distances)
+            best_idxs = [i for i, d in enumerate(min_distances) if d == max_min_distance]
             
             # Добавляем лучшего кандидата
-            if best_candidates:
-                fitnesses = [ind.fitness for ind in best_candidates]
-                scaled_weights = self.scale_weights(fitnesses)
-                candidate = random.choices(best_candidates, 
-                                           weights=scaled_weights, 
-                                           k=1)[0]
-                remaining.remove(candidate)
-                selected.append(candidate)
-            else:
-                # Если не нашли подходящего кандидата, добавляем случайно
-                selected.append(remaining.pop(0))
+            fitnesses = [remaining[i].fitness for i in best_idxs]
+            scaled_weights = self.scale_weights(fitnesses)
+            idx = self.rng.choices(best_idxs, 
+                                 weights=scaled_weights, 
+                                 k=1)[0]
+            candidate = remaining.pop(idx)
+            min_distances.pop(idx)
+            selected.append(candidate)
+            
+            # Обновляем минимальные расстояния оставшихся особей
+            min_distances = [
+                min(d, self._hamming_distance(ind, candidate))
+                for d, ind in zip(min_distances, remaining)
+            ]
         
+        if self.params.deduplicate:
+            duplicates.sort(key=lambda ind: ind.fitness, reverse=True)
+            selected += duplicates[:self.params.population_size - len(selected)]
         return selected
 
 
@@ -216,14 +549,72 @@ class GeneticAlgorithm:
         current_best = self.population.best
         if current_best and current_best.fitness > self.best_fitness:
             # Найдено улучшение
-            self.best_fitness = current_best.fitness
-            self.best_chromosome = current_best.chromosome
-            self.stagnation_count = 0
+            self._set_best(current_best)
         else:
             # Улучшения нет - увеличиваем счетчик застоя
             self.stagnation_count += 1
             
 
+    def add_immigrants(self, immigrants: List[Individual]):
+        """Заменяет худших особей популяции особями, пришедшими с других островов"""
+        survivors = self.population.select_best(max(0, len(self.population.individuals) - len(immigrants)))
+        self.population = Population(survivors + immigrants)
+        
+        # Мигранты могут улучшить лучшее решение острова
+        best = self.population.best
+        if best is not None and best.fitness > self.best_fitness:
+            self._set_best(best)
+
+
+    def _set_best(self, individual: Individual):
+        """Запоминает новое лучшее решение и при необходимости сокращает рабочий граф"""
+        self.best_fitness = individual.fitness
+        self.best_chromosome = self.to_full_chromosome(individual)
+        self.stagnation_count = 0
+        if self.params.core_pruning:
+            self._prune_graph()
+
+
+    def _prune_graph(self):
+        """
+        Удаляет из рабочего графа вершины с ядерным числом меньше размера лучшей клики:
+        они не входят ни в одну клику большего размера. Особи популяции переводятся
+        в нумерацию нового рабочего графа
+        """
+        full = self.full_graph
+        core = full.core_decomposition()[0]     # Ядерные числа в исходной нумерации
+        current = self.full_index if self.full_index is not None else range(self.n)
+        vertices = sorted(v for v in current if core[full.new_to_old[v]] >= self.best_fitness)
+        if len(vertices) == self.n:
+            return
+        if len(vertices) <= self.best_fitness:
+            # Оставшихся вершин не хватит на клику больше лучшей - лучшее решение оптимально
+            self.upper_bound = self.best_fitness
+            return
+
+        individuals = [self.to_full_bits(ind.bits) for ind in self.population.individuals]
+
+        # Подграф заново упорядочивается по степеням
+        graph = full.induced_subgraph(vertices)
+        graph.set_backend(self.params.graph_backend)
+        graph.transform_by_degree()
+        self.graph = graph
+        self.n = graph.n
+        self.full_index = [vertices[v] for v in graph.new_to_old]
+        self.work_index = {v: i for i, v in enumerate(self.full_index)}
+        self.population = Population([type(ind).from_bits(self.from_full_bits(bits), self.n)
+                                      for ind, bits in zip(self.population.individuals, individuals)])
+        self._first_cum_weights = None
+        self._degrees = None
+        if self.repair_cache is not None:
+            self.repair_cache.clear()
+
+        # Процессы пула работают со старым графом
+        if self.offspring_pool is not None:
+            self.offspring_pool.close()
+            self.offspring_pool = self._create_offspring_pool()
+
+
     def _reduce_parameters(self):
         """Уменьшает параметры алгоритма на заданный процент от начальных значений"""
         # Уменьшаем количество точек разрыва
@@ -246,35 +637,56 @@ class GeneticAlgorithm:
         return (
             self.generation >= self.params.max_generations or           # Достигнуто максимальное число поколений
             self.stagnation_count >= self.params.stagnation_limit or    # Превышен лимит застоя
-            self.best_fitness >= self.max_degree_original + 1           # Найдена максимально возможная клика
+            self.best_fitness >= self.upper_bound                       # Найдена максимально возможная клика
         )
     
     
+    def produce_pair(self, p1: Individual, p2: Individual) -> Tuple[Individual, Individual]:
+        """Получает двух потомков пары родителей: скрещивание, мутация и восстановление"""
+        if self.sparse:
+            child1, child2 = self.sparse_crossover(p1, p2)
+            return (SparseIndividual(self.sparse_mutate_and_repair(child1), self.n),
+                    SparseIndividual(self.sparse_mutate_and_repair(child2), self.n))
+        
+        # Скрещивание
+        child1, child2 = self.crossover(p1, p2)
+        # Мутация и восстановление
+        repaired1 = self.mutate_and_repair(child1)
+        repaired2 = self.mutate_and_repair(child2)
+        # Создание новых особей
+        return Individual(repaired1), Individual(repaired2)
+
+
+    def close(self):
+        """Освобождает ресурсы алгоритма (пул процессов)"""
+        if self.offspring_pool is not None:
+            self.offspring_pool.close()
+            self.offspring_pool = None
+
+
     def next_generation(self):
         """Выполняет одну итерацию генетического алгоритма"""
         # Выбираем родителей
         parents = self.select_parents()
         
         # Генерируем потомков
-        offspring = []
-        for i in range(0, len(parents), 2):
-            if i + 1 < len(parents):
-                p1, p2 = parents[i], parents[i + 1]
-                # Скрещивание
-                child1, child2 = self.crossover(p1, p2)
-                # Мутация и восстановление
-                repaired1 = self.mutate_and_repair(child1)
-                repaired2 = self.mutate_and_repair(child2)
-                # Создание новых особей
-                offspring.append(Individual(repaired1))
-                offspring.append(Individual(repaired2))
+        if self.offspring_pool is not None:
+            offspring = self.offspring_pool.produce(self, parents)
+        else:
+            offspring = []
+            for i in range(0, len(parents) - 1, 2):
+                offspring.extend(self.produce_pair(parents[i], parents[i + 1]))
+        
+        # Локальное улучшение лучших потомков
+        if self.params.local_search_elite > 0:
+            self.local_search_phase(offspring)
         
         # Формируем новую популяцию
         new_individuals = self.select_new_population(
             self.population.individuals, offspring
         )
         self.population = Population(new_individuals)
-        self.population.update_stats()  
+        self.population.duplicate_rate = self.duplicate_rate
         
         # Обновляем лучшее решение
         self._update_best_solution()
@@ -290,12 +702,11 @@ class GeneticAlgorithm:
 
     def get_population_chromosomes(self) -> List[List[int]]:
         """Возвращает хромосомы текущей популяции""" 
-        return [self.graph.transform_to_original(ind.chromosome) 
-                for ind in self.population.individuals]
+        return [self.to_original_chromosome(ind) for ind in self.population.individuals]
 
 
     def get_best_solution(self) -> Tuple[int, List[int]]:
         """Возвращает лучшее решение в исходной нумерации вершин"""
         if self.best_chromosome is None:
             return []
-        return self.graph.transform_to_original(self.best_chromosome)
\ No newline at end of file
+        return self.full_graph.transform_to_original(self.best_chromosome)
\ No newline at end of file
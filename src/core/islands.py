@@ -0,0 +1,188 @@
+﻿import random
+import multiprocessing as mp
+from modules.graph import Graph
+from modules.parameters import Parameters
+from modules.individual import Individual
+from modules.population import Population
+from modules.history import History
+from modules.bitset import to_mask, from_mask
+from modules.shared_graph import SharedGraph
+from typing import List
+
+# Множители вероятностей мутации для вариантов параметров островов
+MUTATION_FACTORS = (1.0, 0.5, 1.5, 0.75, 1.25)
+
+
+def island_parameters(params: Parameters, index: int) -> Parameters:
+    """Вариант параметров для острова index: свое зерно и свои вероятности мутации"""
+    factor = MUTATION_FACTORS[index % len(MUTATION_FACTORS)]
+    return params.process_variant(factor, params.process_seed(index))
+
+
+def _snapshot(algorithm) -> tuple:
+    """Состояние острова для передачи в основной процесс"""
+    best_bits = to_mask(algorithm.best_chromosome) if algorithm.best_chromosome is not None else 0
+    return ([algorithm.to_full_bits(ind.bits) for ind in algorithm.population.individuals],
+            algorithm.best_fitness, best_bits, algorithm.should_stop())
+
+
+def _island_worker(conn, algorithm_class, graph_handle: tuple, params: Parameters):
+    """Цикл процесса-острова: выполняет команды основного процесса"""
+    graph = SharedGraph.attach(graph_handle, params.graph_backend)
+    algorithm = algorithm_class(graph, params)
+    conn.send(_snapshot(algorithm))
+    while True:
+        command, payload = conn.recv()
+        if command == 'step':
+            algorithm.next_generation()
+            conn.send(_snapshot(algorithm))
+        elif command == 'emigrants':
+            conn.send([algorithm.to_full_bits(ind.bits) for ind in algorithm.population.select_best(payload)])
+        elif command == 'immigrants':
+            algorithm.add_immigrants([algorithm.individual_from_bits(algorithm.from_full_bits(bits))
+                                      for bits in payload])
+            conn.send(_snapshot(algorithm))
+        elif command == 'close':
+            break
+    conn.close()
+
+
+class IslandModel:
+    """
+    Островная модель: несколько независимых генетических алгоритмов в отдельных процессах,
+    каждый со своим вариантом параметров. Каждые migration_interval поколений острова
+    обмениваются лучшими особями по кольцу или со случайными соседями.
+    Интерфейс совпадает с GeneticAlgorithm, поэтому модель используется AlgorithmManager
+    """
+
+    def __init__(self, graph: Graph, params: Parameters, algorithm_class):
+        self.graph = graph
+        self.params = params
+        self.n = graph.n
+
+        # Граф преобразуется до запуска островов, чтобы нумерация вершин совпадала
+        graph.set_backend(params.graph_backend)
+        if not graph.is_transformed():
+            graph.transform_by_degree()
+        self.upper_bound = graph.clique_upper_bound()
+        self.shared_graph = SharedGraph(graph)      # Граф публикуется один раз для всех островов
+
+        # Состояние модели
+        self.generation = 0
+        self.best_fitness = 0
+        self.best_chromosome = None
+        self.stagnation_count = 0          # Поколения без улучшения лучшей клики всех островов
+        self.histories = [History() for _ in range(params.island_count)]   # История каждого острова
+
+        # Свой генератор для случайной топологии миграции: общий модуль random не сбрасывается
+        self.rng = random.Random(params.seed)
+
+        # Запуск островов
+        context = mp.get_context()
+        self.connections = []
+        self.processes = []
+        for i in range(params.island_count):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_island_worker,
+                args=(child_conn, algorithm_class, self.shared_graph.handle, island_parameters(params, i)),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+        self._collect([conn.recv() for conn in self.connections])
+
+
+    def _collect(self, snapshots: List[tuple]):
+        """Обновляет общую популяцию, истории островов и лучшее решение по состояниям островов"""
+        individuals = []
+        improved = False
+        self.islands_stopped = True
+        for history, (population_bits, best_fitness, best_bits, stopped) in zip(self.histories, snapshots):
+            island = [Individual.from_bits(bits, self.n) for bits in population_bits]
+            history.record(Population(island))
+            individuals.extend(island)
+            self.islands_stopped = self.islands_stopped and stopped
+            if best_fitness > self.best_fitness:
+                self.best_fitness = best_fitness
+                self.best_chromosome = from_mask(best_bits, self.n)
+                improved = True
+
+        self.population = Population(individuals)
+        self.stagnation_count = 0 if improved else self.stagnation_count + 1
+
+
+    def _migrate(self) -> List[tuple]:
+        """Передает лучших особей каждого острова соседнему и возвращает новые состояния островов"""
+        count = len(self.connections)
+        for conn in self.connections:
+            conn.send(('emigrants', self.params.migration_size))
+        emigrants = [conn.recv() for conn in self.connections]
+
+        # Кольцо: остров i получает особей острова i - 1; случайная топология: случайного другого острова
+        if self.params.migration_topology == 'random':
+            sources = [self.rng.choice([j for j in range(count) if j != i]) for i in range(count)]
+        else:
+            sources = [(i - 1) % count for i in range(count)]
+
+        for conn, source in zip(self.connections, sources):
+            conn.send(('immigrants', emigrants[source]))
+        return [conn.recv() for conn in self.connections]
+
+
+    def next_generation(self):
+        """Выполняет одно поколение на всех островах параллельно и при необходимости миграцию"""
+        for conn in self.connections:
+            conn.send(('step', None))
+        snapshots = [conn.recv() for conn in self.connections]
+        self.generation += 1
+
+        if len(self.connections) > 1 and self.generation % self.params.migration_interval == 0:
+            snapshots = self._migrate()
+        self._collect(snapshots)
+
+
+    def should_stop(self) -> bool:
+        """
+        Модель останавливается по числу поколений, застою лучшей клики всех островов,
+        найденной границе или остановке всех островов
+        """
+        return (
+            self.generation >= self.params.max_generations or
+            self.stagnation_count >= self.params.stagnation_limit or
+            self.best_fitness >= self.upper_bound or
+            self.islands_stopped
+        )
+
+
+    def get_population_chromosomes(self) -> List[List[int]]:
+        """Возвращает хромосомы особей всех островов в исходной нумерации"""
+        return [self.graph.transform_to_original(ind.chromosome)
+                for ind in self.population.individuals]
+
+
+    def get_best_solution(self) -> List[int]:
+        """Возвращает лучшее решение по всем островам в исходной нумерации вершин"""
+        if self.best_chromosome is None:
+            return []
+        return self.graph.transform_to_original(self.best_chromosome)
+
+
+    def close(self):
+        """Останавливает процессы островов"""
+        for conn in self.connections:
+            try:
+                conn.send(('close', None))
+                conn.close()
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.connections = []
+        self.processes = []
+        self.shared_graph.close()
@@ -0,0 +1,170 @@
+﻿import random
+from collections import Counter, deque
+from modules.bitset import bit_indices
+from typing import List, Set, Tuple
+
+
+class LocalSearch:
+    """
+    Локальный поиск меметической фазы: клика улучшается ходами добавления
+    (вершина смежна всем вершинам клики) и обмена на плато (вершина смежна
+    всем, кроме одной, - эта одна удаляется). Удаленная вершина не может вернуться
+    в клику tabu_tenure ходов, поэтому поиск не зацикливается на одном плато.
+    Клики и соседи вершин - битовые маски, счетчики накапливаются за весь запуск
+    """
+
+    def __init__(self, tabu_tenure: int, rng: random.Random):
+        self.tabu_tenure = tabu_tenure
+        self.rng = rng          # Генератор случайных чисел алгоритма
+        self.calls = 0          # Количество запусков поиска
+        self.moves = 0          # Количество выполненных ходов
+        self.improvements = 0   # Количество запусков, увеличивших клику
+
+
+    @staticmethod
+    def one_missing(members: List[int], masks: List[int], clique: int, n: int) -> List[Tuple[int, int]]:
+        """
+        Для каждой вершины v клики - вершины вне клики, смежные всем вершинам клики, кроме v.
+        Пересечения соседей без одной вершины строятся префиксными и суффиксными масками
+        (начальные маски - все n вершин, иначе у клики из одной вершины маска вышла бы бесконечной)
+        """
+        everything = (1 << n) - 1
+        k = len(members)
+        suffix = [0] * (k + 1)
+        suffix[k] = everything
+        for i in range(k - 1, -1, -1):
+            suffix[i] = suffix[i + 1] & masks[members[i]]
+
+        swaps = []
+        prefix = everything
+        for i, v in enumerate(members):
+            candidates = prefix & suffix[i + 1] & ~masks[v] & ~clique
+            if candidates:
+                swaps.append((v, candidates))
+            prefix &= masks[v]
+        return swaps
+
+
+    @staticmethod
+    def one_missing_sparse(members: List[int], graph, clique: Set[int]) -> List[Tuple[int, Set[int]]]:
+        """
+        То же, что one_missing, но на множествах соседей графа: вершины вне клики, смежные
+        k - 1 вершинам клики, находятся подсчетом по спискам соседей вершин клики.
+        Время зависит от степеней вершин клики (кроме клики из одной вершины), а не от n
+        """
+        k = len(members)
+        if k == 0:
+            return []
+        if k == 1:
+            v = members[0]
+            candidates = {u for u in range(graph.n) if u not in clique and not graph.has_edge(v, u)}
+            return [(v, candidates)] if candidates else []
+
+        counts = Counter(u for v in members for u in graph.transformed_adj[v] if u not in clique)
+        missing = {}
+        for u, count in counts.items():
+            if count == k - 1:
+                v = next(v for v in members if not graph.has_edge(v, u))
+                missing.setdefault(v, set()).add(u)
+        return [(v, missing[v]) for v in members if v in missing]
+
+
+    def improve(self, clique: int, masks: List[int], n: int, moves: int) -> int:
+        """Выполняет не более moves ходов и возвращает лучшую найденную клику"""
+        self.calls += 1
+        start_size = clique.bit_count()
+        best = clique
+        best_size = start_size
+        size = start_size
+        tabu = deque()              # Пары (ход освобождения, вершина) в порядке удаления
+        tabu_mask = 0
+
+        for move in range(moves):
+            # Запрет на возврат действует tabu_tenure ходов после удаления
+            while tabu and tabu[0][0] <= move:
+                tabu_mask &= ~(1 << tabu.popleft()[1])
+
+            members = bit_indices(clique)
+            candidates = (1 << n) - 1
+            for v in members:
+                candidates &= masks[v]
+            candidates &= ~tabu_mask
+
+            if candidates:
+                # Добавление: вершина, оставляющая больше всего кандидатов
+                vertices = bit_indices(candidates)
+                scores = [(masks[u] & candidates).bit_count() for u in vertices]
+                top = max(scores)
+                u = self.rng.choice([u for u, s in zip(vertices, scores) if s == top])
+                clique |= 1 << u
+                size += 1
+                if size > best_size:
+                    best, best_size = clique, size
+            else:
+                # Обмен на плато: случайная вершина, несмежная ровно одной вершине клики
+                swaps = [(v, c & ~tabu_mask) for v, c in self.one_missing(members, masks, clique, n)]
+                swaps = [(v, c) for v, c in swaps if c]
+                if not swaps:
+                    break
+                v, c = self.rng.choice(swaps)
+                u = self.rng.choice(bit_indices(c))
+                clique = clique ^ (1 << v) | (1 << u)
+                tabu.append((move + self.tabu_tenure + 1, v))
+                tabu_mask |= 1 << v
+
+            self.moves += 1
+
+        if best_size > start_size:
+            self.improvements += 1
+        return best
+
+
+    def improve_sparse(self, clique: List[int], graph, moves: int) -> List[int]:
+        """
+        То же, что improve, для клики из номеров вершин: кандидаты - общие соседи графа
+        (graph.common_neighbors), поэтому битовые маски длины n не строятся.
+        При том же генераторе выбирает те же ходы, что improve
+        """
+        self.calls += 1
+        clique = set(clique)
+        start_size = len(clique)
+        best = set(clique)
+        tabu = deque()              # Пары (ход освобождения, вершина) в порядке удаления
+        tabu_set = set()
+
+        for move in range(moves):
+            while tabu and tabu[0][0] <= move:
+                tabu_set.discard(tabu.popleft()[1])
+
+            members = sorted(clique)
+            candidates = graph.common_neighbors(members) if members else set(range(graph.n))
+            candidates -= clique
+            candidates -= tabu_set
+
+            if candidates:
+                # Добавление: вершина, оставляющая больше всего кандидатов (петли не считаются)
+                vertices = sorted(candidates)
+                scores = [len(graph.common_neighbors([u], candidates - {u})) for u in vertices]
+                top = max(scores)
+                u = self.rng.choice([u for u, s in zip(vertices, scores) if s == top])
+                clique.add(u)
+                if len(clique) > len(best):
+                    best = set(clique)
+            else:
+                # Обмен на плато: случайная вершина, несмежная ровно одной вершине клики
+                swaps = [(v, c - tabu_set) for v, c in self.one_missing_sparse(members, graph, clique)]
+                swaps = [(v, c) for v, c in swaps if c]
+                if not swaps:
+                    break
+                v, c = self.rng.choice(swaps)
+                u = self.rng.choice(sorted(c))
+                clique.remove(v)
+                clique.add(u)
+                tabu.append((move + self.tabu_tenure + 1, v))
+                tabu_set.add(v)
+
+            self.moves += 1
+
+        if len(best) > start_size:
+            self.improvements += 1
+        return sorted(best)
@@ -5,6 +5,10 @@ from modules.individual import Individual
 from modules.population import Population
 from modules.history import History
 from core.genetic import GeneticAlgorithm
+from core.numpy_genetic import NumpyGeneticAlgorithm
+from core.islands import IslandModel
+from core.portfolio import Portfolio, PortfolioResult
+from core.exact import ExactSolver
 from gui.utils import RandomGenerator
 import matplotlib.pyplot as plt
 from typing import List, Tuple, Optional
@@ -19,6 +23,7 @@ class AlgorithmManager:
         self.history: Optional[History] = None
         self.is_initialized = False
         self.is_completed = False
+        self.portfolio_result: Optional[PortfolioResult] = None
         
 
     def load_graph_from_matrix(self, file_path: str) -> None:
@@ -92,8 +97,37 @@ class AlgorithmManager:
             max_crossover_points=data['max_crossover_points'],
             decrease_percent=float(data['decrease_percent']),
             decrease_step=data['decrease_step'],
+            graph_backend=data.get('graph_backend', 'sets'),
+            engine=data.get('engine', 'python'),
+            selection_method=data.get('selection_method', 'roulette'),
+            tournament_size=data.get('tournament_size', 2),
+            parallel_workers=data.get('parallel_workers', 0),
+            seed=data.get('seed'),
+            island_count=data.get('island_count', 0),
+            migration_interval=data.get('migration_interval', 10),
+            migration_size=data.get('migration_size', 2),
+            migration_topology=data.get('migration_topology', 'ring'),
+            portfolio_solvers=data.get('portfolio_solvers', 4),
+            portfolio_deadline=float(data.get('portfolio_deadline', 60.0)),
+            exact_step_nodes=data.get('exact_step_nodes', 1000),
+            exact_node_limit=data.get('exact_node_limit', 0),
+            exact_time_limit=float(data.get('exact_time_limit', 0.0)),
+            core_pruning=data.get('core_pruning', False),
+            greedy_extension=data.get('greedy_extension', False),
+            local_search_elite=data.get('local_search_elite', 0),
+            local_search_moves=data.get('local_search_moves', 100),
+            local_search_tabu=data.get('local_search_tabu', 7),
+            crossover_method=data.get('crossover_method', 'multipoint'),
+            mutation_method=data.get('mutation_method', 'uniform'),
+            chromosome_mode=data.get('chromosome_mode', 'dense'),
+            crossover_buffers=data.get('crossover_buffers', False),
+            deduplicate=data.get('deduplicate', False),
+            repair_cache_size=data.get('repair_cache_size', 0),
+            repair_cache_ties=data.get('repair_cache_ties', 'deterministic'),
+            survival_method=data.get('survival_method', 'maxmin'),
+            rtr_window=data.get('rtr_window', 16),
         )
-        self.algorithm = GeneticAlgorithm(self.graph, self.params)
+        self.algorithm = self._create_algorithm()
 
 
     def _check_initialization(self) -> None:
@@ -102,6 +136,20 @@ class AlgorithmManager:
             self.initialize_algorithm()
 
 
+    def _create_algorithm(self) -> GeneticAlgorithm:
+        """Создает алгоритм с реализацией, выбранной в параметрах"""
+        # Ресурсы предыдущего алгоритма (пул процессов) больше не нужны
+        if self.algorithm is not None:
+            self.algorithm.close()
+        
+        if self.params.engine == 'exact':
+            return ExactSolver(self.graph, self.params)
+        algorithm_class = NumpyGeneticAlgorithm if self.params.engine == 'numpy' else GeneticAlgorithm
+        if self.params.island_count > 1:
+            return IslandModel(self.graph, self.params, algorithm_class)
+        return algorithm_class(self.graph, self.params)
+
+
     def initialize_algorithm(self) -> None:
         """Инициализирует алгоритм с текущими графом и параметрами"""
         if self.graph is None:
@@ -109,7 +157,7 @@ class AlgorithmManager:
         if self.params is None:
             raise RuntimeError("To execute algorithm, the parameters must be set")
         
-        self.algorithm = GeneticAlgorithm(self.graph, self.params)
+        self.algorithm = self._create_algorithm()
         self.history = History()
         self.is_initialized = True
         self.is_completed = False
@@ -118,6 +166,12 @@ class AlgorithmManager:
         self.history.record(self.algorithm.population)
 
 
+    @property
+    def island_histories(self) -> Optional[List[History]]:
+        """Истории островов в островном режиме (None для одного алгоритма)"""
+        return getattr(self.algorithm, 'histories', None)
+
+
     def _check_ready(self) -> None:
         """Проверяет, готов ли алгоритм к выполнению"""
         if not self.is_initialized:
@@ -168,6 +222,20 @@ class AlgorithmManager:
         return self._get_current_state()
 
 
+    def run_portfolio(self, solvers: int = None, deadline: float = None) -> PortfolioResult:
+        """
+        Запускает параллельную гонку решателей на текущем графе:
+        ГА с разными зернами и наборами параметров и жадную эвристику.
+        Возвращает лучшую клику, победивший решатель и время нахождения
+        """
+        if self.graph is None or self.params is None:
+            raise RuntimeError("Cannot run portfolio: graph or parameters not set")
+        
+        algorithm_class = NumpyGeneticAlgorithm if self.params.engine == 'numpy' else GeneticAlgorithm
+        self.portfolio_result = Portfolio(self.graph, self.params, algorithm_class, solvers, deadline).run()
+        return self.portfolio_result
+
+
     def _get_current_state(self) -> Tuple[List[int], List[List[int]]]:
         """Возвращает текущее состояние алгоритма"""
         # Получаем лучшее решение
@@ -203,7 +271,7 @@ class AlgorithmManager:
             raise RuntimeError("Cannot reset algorithm: graph or parameters not set")
             
         # Пересоздаем алгоритм с текущими параметрами
-        self.algorithm = GeneticAlgorithm(self.graph, self.params)
+        self.algorithm = self._create_algorithm()
         self.history = History()
         self.is_completed = False
         
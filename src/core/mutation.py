@@ -0,0 +1,47 @@
+﻿"""
+Вспомогательные функции мутации. Инвертируемые гены распределены так же,
+как при независимой инверсии каждого гена с вероятностью p, но разыгрываются
+скачками с геометрическими промежутками - за время, пропорциональное числу инверсий
+"""
+import math
+import random
+import numpy as np
+from typing import List
+
+
+def flip_positions(n: int, p: float, rng: random.Random) -> List[int]:
+    """Номера успешных испытаний среди n независимых испытаний с вероятностью p (по возрастанию)"""
+    if n <= 0 or p <= 0.0:
+        return []
+    if p >= 1.0:
+        return list(range(n))
+
+    # Количество неудач до следующего успеха имеет геометрическое распределение
+    log_q = math.log(1.0 - p)
+    positions = []
+    position = int(math.log(1.0 - rng.random()) / log_q)
+    while position < n:
+        positions.append(position)
+        position += int(math.log(1.0 - rng.random()) / log_q) + 1
+    return positions
+
+
+def flip_count(n: int, p: float, rng: random.Random) -> int:
+    """Количество успехов среди n испытаний с вероятностью p (биномиальное распределение)"""
+    return len(flip_positions(n, p, rng))
+
+
+def flip_positions_numpy(rng: np.random.Generator, length: int, p: float) -> np.ndarray:
+    """Номера успешных испытаний среди length испытаний - промежутки разыгрываются массивом"""
+    if length <= 0 or p <= 0.0:
+        return np.empty(0, dtype=np.int64)
+    if p >= 1.0:
+        return np.arange(length)
+
+    # Промежутков берется с запасом; если их не хватило до конца, добавляются новые
+    expected = length * p
+    size = int(expected + 5 * math.sqrt(expected)) + 16
+    positions = np.cumsum(rng.geometric(p, size)) - 1
+    while positions[-1] < length:
+        positions = np.concatenate((positions, positions[-1] + np.cumsum(rng.geometric(p, size))))
+    return positions[positions < length]
@@ -0,0 +1,297 @@
+﻿import numpy as np
+from modules.graph import Graph
+from modules.parameters import Parameters
+from modules.individual import Individual
+from modules.population import Population
+from core.genetic import GeneticAlgorithm
+from core.selection import select_indices
+from modules.bitset import to_mask, from_mask
+from core.mutation import flip_positions_numpy
+from core.dedup import first_occurrences
+from typing import List
+
+SPARSE_MUTATION_PROB = 0.05     # При меньшей вероятности мутации гена разыгрываются только номера инверсий
+
+
+class NumpyGeneticAlgorithm(GeneticAlgorithm):
+    """
+    Генетический алгоритм, хранящий всю популяцию в виде матрицы NumPy (особь - строка).
+    Кроссовер, мутация и вычисление приспособленности выполняются сразу для всей популяции
+    """
+
+    def __init__(self, graph: Graph, params: Parameters):
+        super().__init__(graph, params)
+        # Генератор NumPy получает зерно от генератора алгоритма, чтобы seed управлял обоими
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        self.matrix = self._to_matrix(self.population.individuals)   # Популяция: матрица размера P x n
+        self.fitness = self.matrix.sum(axis=1)                        # Приспособленности особей
+        self.buffers = {}                                             # Буферы кроссовера по именам
+
+
+    def _create_offspring_pool(self):
+        """Потомки получаются сразу для всей матрицы, пул процессов не используется"""
+        return None
+
+
+    def _to_matrix(self, individuals: List[Individual]) -> np.ndarray:
+        """Собирает хромосомы особей в матрицу uint8"""
+        matrix = np.zeros((len(individuals), self.n), dtype=np.uint8)
+        for i, ind in enumerate(individuals):
+            matrix[i] = ind.chromosome
+        return matrix
+
+
+    def _buffer(self, name: str, shape: tuple) -> np.ndarray:
+        """
+        Матрица uint8 для промежуточных данных поколения. При crossover_buffers
+        матрица того же размера берется из предыдущего поколения, иначе создается новая
+        """
+        if not self.params.crossover_buffers:
+            return np.empty(shape, dtype=np.uint8)
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+
+    def select_parent_indices(self) -> np.ndarray:
+        """Выбирает номера родителей методом, заданным в параметрах (как select_parents)"""
+        return np.array(select_indices(self.fitness,
+                                       self.params.population_size,
+                                       self.params.selection_method,
+                                       self.params.fitness_scaling_percent,
+                                       self.rng,
+                                       self.params.tournament_size,
+                                       self.np_rng), dtype=np.intp)
+
+
+    def segment_masks(self, pairs: int) -> np.ndarray:
+        """
+        Строит маски сегментов для многоточечного кроссовера всех пар сразу:
+        True - ген берется от второго родителя
+        """
+        masks = self._buffer('masks', (pairs, self.n))
+        masks.fill(0)
+        if self.n <= 1:
+            return masks.view(bool)
+
+        breaks = min(self.current_crossover_points, self.n - 1)
+        for i in range(pairs):
+            masks[i, self.np_rng.choice(self.n - 1, size=breaks, replace=False) + 1] = 1
+
+        # Каждая точка разрыва меняет родителя-источника: четность накопленной суммы
+        # (переполнение uint8 четность не меняет)
+        np.cumsum(masks, axis=1, dtype=np.uint8, out=masks)
+        masks &= 1
+        return masks.view(bool)
+
+
+    def crossover_all(self, parents1: np.ndarray, parents2: np.ndarray) -> np.ndarray:
+        """Выполняет кроссовер методом из параметров для всех пар и возвращает матрицу потомков"""
+        method = self.params.crossover_method
+        # Потомки пары идут подряд, как в GeneticAlgorithm.next_generation
+        children = self._buffer('children', (2 * len(parents1), self.n))
+        child1, child2 = children[0::2], children[1::2]
+        if method == 'intersection':
+            # Оба потомка пары начинаются с общих вершин и дополняются независимо
+            np.bitwise_and(parents1, parents2, out=child1)
+            child2[...] = child1
+        elif method == 'union':
+            np.bitwise_or(parents1, parents2, out=child1)
+            child2[...] = child1
+        else:
+            # Потомок копирует своего родителя и берет гены другого родителя в маске сегментов
+            masks = self.segment_masks(len(parents1))
+            np.copyto(child1, parents1)
+            np.copyto(child1, parents2, where=masks)
+            np.copyto(child2, parents2)
+            np.copyto(child2, parents1, where=masks)
+
+        if method == 'intersection':
+            self.sampler.extend(children.view(bool), self.rng)
+        return children
+
+
+    def mutate_all(self, children: np.ndarray) -> np.ndarray:
+        """
+        Мутирует матрицу потомков на месте: в выбранных строках каждый ген инвертируется
+        с вероятностью current_mutation_prob_gene, разыгрываются только номера инвертируемых генов.
+        Возвращает номера выбранных для мутации строк
+        """
+        rows = np.flatnonzero(self.np_rng.random(len(children)) < self.current_mutation_prob_chrom)
+        if self.params.mutation_method == 'neighbourhood':
+            self.neighbourhood_mutate_rows(children, rows)
+            return rows
+        if self.n == 0:
+            return rows
+        p = self.current_mutation_prob_gene
+        if p > SPARSE_MUTATION_PROB:
+            children[rows] ^= (self.np_rng.random((len(rows), self.n)) < p).view(np.uint8)
+            return rows
+        positions = flip_positions_numpy(self.np_rng, len(rows) * self.n, p)
+        children[rows[positions // self.n], positions % self.n] ^= 1
+        return rows
+
+
+    def neighbourhood_mutate_rows(self, children: np.ndarray, rows: np.ndarray) -> None:
+        """Мутация с учетом соседства для выбранных строк; количества инверсий - биномиальные"""
+        p = self.current_mutation_prob_gene
+        for i in rows:
+            bits = to_mask(children[i])
+            size = bits.bit_count()
+            removals = int(self.np_rng.binomial(size, p))
+            additions = int(self.np_rng.binomial(self.n - size, p))
+            children[i] = from_mask(self.neighbourhood_mutation(bits, removals, additions), self.n)
+
+
+    def repair_all(self, children: np.ndarray, mutated: np.ndarray = None) -> None:
+        """
+        Восстанавливает каждую строку матрицы до клики на месте.
+        Строки, не выбранные для мутации (не из mutated), восстанавливаются через кэш восстановления
+        """
+        cached = np.ones(len(children), dtype=bool)
+        if self.repair_cache is None:
+            cached[:] = False
+        elif mutated is not None:
+            cached[mutated] = False
+        for row, use_cache in zip(children, cached.tolist()):
+            if use_cache:
+                row[:] = from_mask(self.cached_repair_bits(to_mask(row)), self.n)
+            else:
+                removed = self.graph.vertices_to_remove(np.flatnonzero(row).tolist(), rng=self.rng)
+                row[removed] = 0
+
+
+    def local_search_rows(self, children: np.ndarray) -> None:
+        """Меметическая фаза для матрицы потомков: улучшает local_search_elite лучших строк на месте"""
+        if self.n == 0 or not len(children):
+            return
+        elite = np.argsort(-children.sum(axis=1), kind='stable')[:self.params.local_search_elite]
+        moves = max(1, self.params.local_search_moves // len(elite))
+        masks = self.sampler.masks
+        for i in elite:
+            bits = to_mask(children[i])
+            improved = self.local_search.improve(bits, masks, self.n, moves)
+            if improved != bits:
+                children[i] = from_mask(improved, self.n)
+
+
+    def select_new_population_indices(self, combined: np.ndarray, fitness: np.ndarray) -> List[int]:
+        """
+        Отбор с сохранением разнообразия (как select_new_population):
+        для каждого кандидата хранится минимальное расстояние до уже выбранных,
+        которое обновляется только относительно последней выбранной особи
+        """
+        fitness = fitness.tolist()
+        remaining = list(range(len(combined)))
+        if not remaining:
+            return []
+
+        # Всегда добавляем лучшую особь (случайную из лучших, если их несколько)
+        max_fitness = max(fitness)
+        best = self.rng.choice([i for i in remaining if fitness[i] == max_fitness])
+        remaining.remove(best)
+        selected = [best]
+        min_distance = (combined != combined[best]).sum(axis=1)
+
+        # Добавляем особи, максимально отличающиеся от уже выбранных
+        while len(selected) < self.params.population_size and remaining:
+            rest = np.array(remaining)
+            distances = min_distance[rest]
+            best_candidates = rest[distances == distances.max()].tolist()
+
+            scaled_weights = self.scale_weights([fitness[i] for i in best_candidates])
+            candidate = self.rng.choices(best_candidates, weights=scaled_weights, k=1)[0]
+            remaining.remove(candidate)
+            selected.append(candidate)
+            np.minimum(min_distance, (combined != combined[candidate]).sum(axis=1), out=min_distance)
+
+        return selected
+
+
+    def add_immigrants(self, immigrants: List[Individual]):
+        """Заменяет худших особей мигрантами и пересобирает матрицу популяции"""
+        super().add_immigrants(immigrants)
+        self.matrix = self._to_matrix(self.population.individuals)
+        self.fitness = self.matrix.sum(axis=1)
+
+
+    def _prune_graph(self):
+        """После сокращения рабочего графа матрица популяции пересобирается"""
+        super()._prune_graph()
+        self.matrix = self._to_matrix(self.population.individuals)
+        self.fitness = self.matrix.sum(axis=1)
+
+
+    def next_generation(self):
+        """Выполняет одну итерацию генетического алгоритма над матрицей популяции"""
+        # Выбираем родителей и формируем пары
+        parents = self.select_parent_indices()
+        pairs = len(parents) // 2
+        parents1 = np.take(self.matrix, parents[0:2 * pairs:2], axis=0, out=self._buffer('parents1', (pairs, self.n)))
+        parents2 = np.take(self.matrix, parents[1:2 * pairs:2], axis=0, out=self._buffer('parents2', (pairs, self.n)))
+
+        # Скрещивание, мутация и восстановление сразу для всех пар
+        offspring = self.crossover_all(parents1, parents2)
+        mutated = self.mutate_all(offspring)
+        self.repair_all(offspring, mutated)
+        if self.params.greedy_extension:
+            self.sampler.extend(offspring.view(bool), self.rng)   # Все клики расширяются до максимальных за один проход
+        if self.params.local_search_elite > 0:
+            self.local_search_rows(offspring)
+
+        # Потомки идут перед текущей популяцией
+        combined = np.concatenate((offspring, self.matrix))
+        fitness = combined.sum(axis=1)
+        if self.survival is not None:
+            self.select_rtr(combined, fitness, len(offspring))
+        else:
+            self.select_maxmin(combined, fitness)
+        self.population = Population([Individual(row) for row in self.matrix])
+        self.population.duplicate_rate = self.duplicate_rate
+
+        # Обновляем лучшее решение
+        self._update_best_solution()
+
+        # Увеличиваем счетчик поколений
+        self.generation += 1
+
+        # Периодически уменьшаем параметры
+        if (self.params.decrease_step > 0 and
+            self.generation % self.params.decrease_step == 0):
+            self._reduce_parameters()
+
+
+    def select_rtr(self, combined: np.ndarray, fitness: np.ndarray, offspring_count: int) -> None:
+        """Отбор выживших ограниченным турниром; строки сравниваются как битовые маски"""
+        bits = [to_mask(row) for row in combined]
+        duplicates = first_occurrences(bits)[1]
+        self.duplicate_count = len(duplicates)
+        self.duplicate_rate = len(duplicates) / len(combined) if len(combined) else 0.0
+
+        selected = self.survival.select(bits, fitness.tolist(), offspring_count,
+                                        self.params.population_size, self.params.deduplicate)
+        self.matrix = combined[selected]
+        self.fitness = fitness[selected]
+
+
+    def select_maxmin(self, combined: np.ndarray, fitness: np.ndarray) -> None:
+        """Отбор выживших с сохранением разнообразия (max-min расстояние) и учетом повторов"""
+        # Сортировка по убыванию приспособленности устойчивая
+        order = np.argsort(-fitness, kind='stable')
+        combined, fitness = combined[order], fitness[order]
+
+        # Повторяющиеся строки (ключ - упакованная строка) считаются и при deduplicate исключаются из отбора;
+        # равные строки имеют равную приспособленность, поэтому первое вхождение то же, что до сортировки
+        unique, duplicates = first_occurrences([row.tobytes() for row in np.packbits(combined, axis=1)])
+        self.duplicate_count = len(duplicates)
+        self.duplicate_rate = len(duplicates) / len(combined) if len(combined) else 0.0
+
+        if self.params.deduplicate:
+            unique = np.array(unique, dtype=np.intp)
+            selected = unique[self.select_new_population_indices(combined[unique], fitness[unique])].tolist()
+            selected += duplicates[:self.params.population_size - len(selected)]
+        else:
+            selected = self.select_new_population_indices(combined, fitness)
+        self.matrix = combined[selected]
+        self.fitness = fitness[selected]
@@ -0,0 +1,69 @@
+﻿from concurrent.futures import ProcessPoolExecutor
+from modules.individual import Individual
+from modules.shared_graph import SharedGraph
+from typing import List
+
+_worker_algorithm = None    # Копия операторов алгоритма в процессе-исполнителе
+
+
+def _init_worker(algorithm_class, graph_handle, params):
+    """Инициализация процесса-исполнителя: граф подключается из общей памяти без копирования"""
+    global _worker_algorithm
+    graph = SharedGraph.attach(graph_handle, params.graph_backend)
+    _worker_algorithm = algorithm_class.replica(graph, params)
+
+
+def _produce_pair(task: tuple) -> tuple:
+    """Получает потомков одной пары родителей в процессе-исполнителе"""
+    bits1, bits2, n, state, seed = task
+    algorithm = _worker_algorithm
+    (algorithm.current_crossover_points,
+     algorithm.current_mutation_prob_chrom,
+     algorithm.current_mutation_prob_gene) = state
+
+    # У каждой пары свой поток случайных чисел, поэтому результат не зависит от числа процессов
+    algorithm.rng.seed(seed)
+    child1, child2 = algorithm.produce_pair(Individual.from_bits(bits1, n), Individual.from_bits(bits2, n))
+    return child1.bits, child2.bits
+
+
+class OffspringPool:
+    """
+    Постоянный пул процессов, получающих потомков пар родителей параллельно.
+    Зерно каждой пары берется из генератора случайных чисел алгоритма, поэтому при заданном
+    seed результат воспроизводим и не зависит от количества процессов
+    """
+
+    def __init__(self, algorithm, workers: int):
+        self.workers = workers
+        self.shared_graph = SharedGraph(algorithm.graph)    # Граф публикуется один раз для всех процессов
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(type(algorithm), self.shared_graph.handle, algorithm.params),
+        )
+
+
+    def produce(self, algorithm, parents: List[Individual]) -> List[Individual]:
+        """Возвращает потомков всех пар родителей в том же порядке, что и последовательный цикл"""
+        state = (algorithm.current_crossover_points,
+                 algorithm.current_mutation_prob_chrom,
+                 algorithm.current_mutation_prob_gene)
+        tasks = [
+            (parents[i].bits, parents[i + 1].bits, algorithm.n, state, algorithm.rng.getrandbits(64))
+            for i in range(0, len(parents) - 1, 2)
+        ]
+        chunksize = max(1, len(tasks) // (4 * self.workers))
+
+        offspring = []
+        individual_class = type(parents[0]) if parents else Individual     # Разреженные или обычные особи
+        for bits1, bits2 in self.executor.map(_produce_pair, tasks, chunksize=chunksize):
+            offspring.append(individual_class.from_bits(bits1, algorithm.n))
+            offspring.append(individual_class.from_bits(bits2, algorithm.n))
+        return offspring
+
+
+    def close(self):
+        """Останавливает процессы пула и освобождает общую память графа"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.shared_graph.close()
@@ -0,0 +1,203 @@
+﻿import copy
+import time
+import queue
+import multiprocessing as mp
+from modules.graph import Graph
+from modules.parameters import Parameters
+from modules.shared_graph import SharedGraph
+from modules.bitset import to_mask, from_mask
+from typing import List, Optional
+
+# Наборы параметров для решателей-ГА: изменения относительно базовых параметров
+PRESETS = {
+    'default': {},
+    'explore': {'mutation_factor': 2.0, 'selection_method': 'tournament'},
+    'exploit': {'mutation_factor': 0.5, 'selection_method': 'sus'},
+}
+
+
+def preset_parameters(params: Parameters, preset: str, seed: Optional[int]) -> Parameters:
+    """Параметры решателя-ГА по набору preset с заданным зерном"""
+    changes = PRESETS[preset]
+    variant = params.process_variant(changes.get('mutation_factor', 1.0), seed)
+    variant.selection_method = changes.get('selection_method', params.selection_method)
+    return variant
+
+
+def _ga_solver(name, algorithm_class, graph_handle, params, shared_size, shared_bits, stop, reports):
+    """
+    Решатель-ГА: перезапускается с новым зерном при остановке алгоритма
+    и подхватывает лучшую клику, найденную другими решателями
+    """
+    graph = SharedGraph.attach(graph_handle, params.graph_backend)
+    reported = 0
+    while not stop.is_set():
+        algorithm = algorithm_class(graph, params)
+        params = copy.copy(params)
+        params.seed += 1000     # Новое зерно для следующего перезапуска
+        while not stop.is_set():
+            if algorithm.best_fitness > reported:
+                reported = algorithm.best_fitness
+                reports.put((name, reported, to_mask(algorithm.best_chromosome)))
+            if algorithm.should_stop():
+                break
+
+            # Общая лучшая клика заменяет худшую особь популяции
+            if shared_size.value > algorithm.best_fitness:
+                with shared_bits.get_lock():
+                    bits = int.from_bytes(bytes(shared_bits.get_obj()), 'little')
+                algorithm.add_immigrants([algorithm.individual_from_bits(algorithm.from_full_bits(bits))])
+            algorithm.next_generation()
+        algorithm.close()
+
+
+def _solver_process(solver, name, *args):
+    """
+    Процесс решателя: когда решатель завершается (в том числе с ошибкой), в очередь отчетов -
+    последний аргумент решателя - отправляется отчет о завершении (name, None, None).
+    Процесс при выходе дожидается передачи всех своих отчетов в очередь
+    """
+    reports = args[-1]
+    try:
+        solver(name, *args)
+    finally:
+        reports.put((name, None, None))
+
+
+def _greedy_solver(name, graph_handle, shared_size, stop, reports):
+    """
+    Жадная эвристика по порядку степеней: из каждой стартовой вершины клика расширяется
+    вершиной наибольшей степени среди общих соседей (вершины уже упорядочены по убыванию степени)
+    """
+    graph = SharedGraph.attach(graph_handle, 'bitset')
+    bits = graph.transformed_bits
+    degrees = graph.transformed_degrees()
+    best = 0
+    for start in range(graph.n):
+        if stop.is_set():
+            break
+        # Клика из start не может быть больше степени start + 1
+        if degrees[start] + 1 <= max(best, shared_size.value):
+            continue
+        clique = 1 << start
+        candidates = bits[start]
+        while candidates:
+            v = (candidates & -candidates).bit_length() - 1
+            clique |= 1 << v
+            candidates &= bits[v]
+        if clique.bit_count() > best:
+            best = clique.bit_count()
+            reports.put((name, best, clique))
+
+
+class PortfolioResult:
+    """Результат гонки решателей"""
+
+    def __init__(self, winner: str, size: int, found_at: float, elapsed: float,
+                 chromosome: List[int], reached_bound: bool):
+        self.winner = winner                    # Решатель, первым нашедший лучшую клику
+        self.size = size                        # Размер лучшей клики
+        self.found_at = found_at                # Время нахождения лучшей клики (секунды от старта)
+        self.elapsed = elapsed                  # Общее время гонки
+        self.chromosome = chromosome            # Лучшая клика в исходной нумерации вершин
+        self.reached_bound = reached_bound      # Достигнута ли верхняя граница (оптимальность доказана)
+
+
+class Portfolio:
+    """
+    Параллельная гонка решателей на одном графе: ГА с разными зернами и наборами параметров
+    и жадная эвристика. Лучшая клика доступна всем решателям через общую память.
+    Гонка заканчивается, как только клика достигает верхней границы или истекает время
+    """
+
+    def __init__(self, graph: Graph, params: Parameters, algorithm_class,
+                 solvers: int = None, deadline: float = None):
+        self.graph = graph
+        self.params = params
+        self.algorithm_class = algorithm_class
+        self.solvers = solvers if solvers is not None else params.portfolio_solvers
+        self.deadline = deadline if deadline is not None else params.portfolio_deadline
+
+        graph.set_backend(params.graph_backend)
+        if not graph.is_transformed():
+            graph.transform_by_degree()
+        self.upper_bound = graph.clique_upper_bound()   # Верхняя граница размера клики
+
+
+    def solver_specs(self) -> List[tuple]:
+        """Имена и параметры решателей-ГА: наборы параметров чередуются, зерна различаются"""
+        names = list(PRESETS)
+        specs = []
+        for i in range(max(0, self.solvers - 1)):
+            preset = names[i % len(names)]
+            specs.append((f'ga-{preset}-{i}', preset_parameters(self.params, preset, self.params.process_seed(i))))
+        return specs
+
+
+    def run(self) -> PortfolioResult:
+        """Запускает гонку и возвращает ее результат"""
+        start = time.perf_counter()
+        n = self.graph.n
+        shared_graph = SharedGraph(self.graph)
+        context = mp.get_context()
+        shared_size = context.Value('i', 0, lock=False)             # Размер лучшей клики
+        shared_bits = context.Array('B', max(1, (n + 7) // 8))      # Лучшая клика (упакованная маска)
+        stop = context.Event()
+        reports = context.Queue()
+
+        processes = [context.Process(target=_solver_process,
+                                     args=(_greedy_solver, 'greedy', shared_graph.handle, shared_size, stop, reports),
+                                     daemon=True)]
+        for name, params in self.solver_specs():
+            processes.append(context.Process(
+                target=_solver_process,
+                args=(_ga_solver, name, self.algorithm_class, shared_graph.handle, params,
+                      shared_size, shared_bits, stop, reports),
+                daemon=True,
+            ))
+        for process in processes:
+            process.start()
+
+        winner, best_bits, found_at = None, 0, 0.0
+        running = len(processes)    # Решатели, еще не отправившие отчет о завершении
+
+        def receive(timeout: float) -> bool:
+            """Принимает один отчет; False - отчетов нет, а все процессы уже завершились (аварийно)"""
+            nonlocal running, winner, best_bits, found_at
+            # Живость проверяется до чтения: завершившийся процесс уже передал в очередь все отчеты
+            alive = any(p.is_alive() for p in processes)
+            try:
+                name, size, bits = reports.get(timeout=timeout)
+            except queue.Empty:
+                return alive
+            if size is None:
+                running -= 1
+            elif size > shared_size.value:
+                winner, best_bits, found_at = name, bits, time.perf_counter() - start
+                with shared_bits.get_lock():
+                    shared_bits.get_obj()[:] = bits.to_bytes(len(shared_bits), 'little')
+                shared_size.value = size
+            return True
+
+        try:
+            while running and shared_size.value < self.upper_bound:
+                remaining = self.deadline - (time.perf_counter() - start)
+                if remaining <= 0 or not receive(min(remaining, 0.1)):
+                    break
+        finally:
+            # Отчеты, отправленные до остановки, дочитываются: иначе процессы не смогут завершиться
+            stop.set()
+            drain_deadline = time.perf_counter() + 5
+            while running and time.perf_counter() < drain_deadline and receive(0.1):
+                pass
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            reports.close()
+            shared_graph.close()
+
+        size = shared_size.value
+        chromosome = self.graph.transform_to_original(from_mask(best_bits, n))
+        return PortfolioResult(winner, size, found_at, time.perf_counter() - start,
+                               chromosome, size >= self.upper_bound)
@@ -0,0 +1,49 @@
+﻿from collections import OrderedDict
+from typing import Optional
+
+
+class RepairCache:
+    """
+    Ограниченный LRU-кэш восстановления: битовая маска хромосомы -> маска восстановленной клики.
+    Используется, когда мутация не изменила потомка кроссовера. Восстановление выбирает
+    удаляемую вершину случайно среди вершин минимальной степени, поэтому семантика задается явно:
+    - 'deterministic': сохраняются только результаты без случайного выбора (на каждом шаге
+      одна вершина минимальной степени) - попадание дает ту же клику, что и новое восстановление;
+    - 'reuse': сохраняется любой результат - повторный потомок получает клику первого восстановления.
+    В обоих режимах попадание не расходует случайные числа восстановления
+    """
+
+    def __init__(self, capacity: int, ties: str):
+        self.capacity = capacity
+        self.ties = ties
+        self.entries = OrderedDict()    # Маска хромосомы -> маска клики (от давних к недавним)
+        self.hits = 0                   # Количество найденных результатов
+        self.misses = 0                 # Количество восстановлений, выполненных заново
+        self.evictions = 0              # Количество вытесненных записей
+
+
+    def get(self, key: int) -> Optional[int]:
+        """Возвращает сохраненную клику (и помечает запись как недавнюю) или None"""
+        repaired = self.entries.get(key)
+        if repaired is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return repaired
+
+
+    def put(self, key: int, repaired: int, random_ties: bool):
+        """Сохраняет результат восстановления, если его допускает режим ties"""
+        if random_ties and self.ties == 'deterministic':
+            return
+        self.entries[key] = repaired
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+    def clear(self):
+        """Удаляет все записи (нумерация вершин рабочего графа изменилась)"""
+        self.entries.clear()
@@ -0,0 +1,174 @@
+﻿import random
+import weakref
+import numpy as np
+from itertools import chain
+from modules.graph import Graph
+from modules.bitset import bit_indices
+from core.selection import scale_weights, scale_weights_list
+
+
+class DegreeSampler:
+    """
+    Строит случайные клики так же, как GeneticAlgorithm.generate_chromosome:
+    вершины выбираются с весами, равными масштабированным степеням, по всем вершинам
+    для первой вершины и по общим соседям уже выбранных вершин для следующих.
+    Степени, веса первой вершины и упакованная матрица смежности вычисляются один раз на граф.
+    Выборщик общий для всех алгоритмов на графе, поэтому генератор случайных чисел передается в каждый вызов
+    """
+
+    _cache = weakref.WeakKeyDictionary()    # Граф -> построенные для него выборщики
+    ROWS_PER_CHUNK = 1 << 22                # Ограничение на размер матрицы весов (строки * n)
+
+    def __init__(self, graph: Graph, scaling_percent: float):
+        self.source = graph.transformed_adj     # Преобразованный граф, по которому построен выборщик
+        self.n = graph.n
+        self.scaling_percent = scaling_percent
+        self.degrees = np.array(graph.transformed_degrees(), dtype=np.float64)
+        self.degree_list = self.degrees.tolist()
+
+        # Соседи вершин преобразованного графа - битовые строки без петель.
+        # Граф из общей памяти уже хранит их в таком виде, маски бэкенда 'bitset' переводятся
+        # в байты напрямую. Строки множеств соседей упаковываются при первом обращении:
+        # начальная популяция читает лишь малую часть строк
+        row_bytes = (self.n + 7) // 8
+        self.adjacency = getattr(graph, 'packed_neighbors', None)
+        self._unpacked = None       # Еще не упакованные строки (None - упакованы все)
+        if self.adjacency is None and graph.transformed_bits:
+            data = b''.join(mask.to_bytes(row_bytes, 'little') for mask in graph.transformed_bits)
+            self.adjacency = np.frombuffer(data, dtype=np.uint8).reshape(self.n, row_bytes)
+        elif self.adjacency is None:
+            self.adjacency = np.empty((self.n, row_bytes), dtype=np.uint8)
+            self._unpacked = np.ones(self.n, dtype=bool)
+
+        # Накопленные веса для выбора первой вершины
+        self.first_cum_weights = np.cumsum(scale_weights(self.degrees, scaling_percent))
+        # Соседи вершин в виде целых чисел. Граф с бэкендом 'bitset' и граф из общей памяти
+        # уже хранят их, иначе маски строятся при первом расширении клики
+        self._masks = getattr(graph, 'row_masks', None) or graph.transformed_bits or None
+
+
+    def rows(self, vertices: np.ndarray) -> np.ndarray:
+        """Упакованные строки смежности вершин (недостающие строки сначала упаковываются)"""
+        if self._unpacked is not None and self._unpacked[vertices].any():
+            missing = np.zeros(self.n, dtype=bool)
+            missing[vertices] = True
+            self._pack_rows(np.flatnonzero(missing & self._unpacked))
+        return self.adjacency[vertices]
+
+
+    def _pack_rows(self, vertices: np.ndarray) -> None:
+        """
+        Упаковывает строки множеств соседей вершин vertices: соседи читаются одним проходом
+        и раскладываются в булевы блоки не больше ROWS_PER_CHUNK ячеек
+        """
+        n = self.n
+        adj = [self.source[v] for v in vertices.tolist()]
+        lengths = np.fromiter(map(len, adj), dtype=np.int64, count=len(adj))
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        rows = np.repeat(np.arange(len(adj)), lengths)
+        columns = np.fromiter(chain.from_iterable(adj), dtype=np.int64, count=int(offsets[-1]))
+
+        chunk = max(1, self.ROWS_PER_CHUNK // n)
+        for start in range(0, len(adj), chunk):
+            stop = min(len(adj), start + chunk)
+            block = np.zeros((stop - start, n), dtype=bool)
+            edges = slice(offsets[start], offsets[stop])
+            block[rows[edges] - start, columns[edges]] = True
+            block[np.arange(stop - start), vertices[start:stop]] = False     # Петли не учитываются
+            self.adjacency[vertices[start:stop]] = np.packbits(block, axis=1, bitorder='little')
+        self._unpacked[vertices] = False
+
+
+    @property
+    def masks(self) -> list[int]:
+        """Соседи вершин в виде битовых масок Python для расширения одной клики (без петель)"""
+        if self._masks is None:
+            self._masks = [int.from_bytes(row.tobytes(), 'little') for row in self.rows(np.arange(self.n))]
+        return self._masks
+
+
+    @classmethod
+    def for_graph(cls, graph: Graph, scaling_percent: float) -> 'DegreeSampler':
+        """Возвращает выборщик для графа, повторно используя уже построенный"""
+        samplers = cls._cache.setdefault(graph, {})
+        sampler = samplers.get(scaling_percent)
+        # Выборщик устаревает, если граф был заново преобразован
+        if sampler is None or sampler.source is not graph.transformed_adj:
+            sampler = cls(graph, scaling_percent)
+            samplers[scaling_percent] = sampler
+        return sampler
+
+
+    def sample(self, count: int, rng: random.Random) -> np.ndarray:
+        """Строит count случайных клик и возвращает их как булеву матрицу count x n"""
+        cliques = np.zeros((count, self.n), dtype=bool)
+        if self.n == 0 or count == 0:
+            return cliques
+
+        # Первые вершины выбираются по заранее накопленным весам
+        total = self.first_cum_weights[-1]
+        for i in range(count):
+            v = int(np.searchsorted(self.first_cum_weights, rng.random() * total, side='right'))
+            cliques[i, min(v, self.n - 1)] = True
+
+        self.extend(cliques, rng)
+        return cliques
+
+
+    def extend(self, cliques: np.ndarray, rng: random.Random) -> None:
+        """Расширяет клики (строки булевой матрицы) на месте, пока у них есть общие соседи"""
+        if self.n == 0:
+            return
+
+        # Кандидаты строки - общие соседи всех вершин ее клики
+        candidates = np.empty((len(cliques), self.adjacency.shape[1]), dtype=np.uint8)
+        for i, clique in enumerate(cliques):
+            members = np.flatnonzero(clique)
+            if len(members):
+                candidates[i] = np.bitwise_and.reduce(self.rows(members), axis=0)
+            else:
+                candidates[i] = 0xFF     # Пустая клика начинается с любой вершины
+
+        chunk = max(1, self.ROWS_PER_CHUNK // self.n)
+        for start in range(0, len(cliques), chunk):
+            self._extend_rows(cliques[start:start + chunk], candidates[start:start + chunk], rng)
+
+
+    def extend_mask(self, clique: int, rng: random.Random) -> int:
+        """
+        Расширяет одну клику (битовую маску) до максимальной так же, как extend:
+        вершина выбирается среди общих соседей с весами по масштабированным степеням
+        """
+        if self.n == 0:
+            return clique
+        masks = self.masks
+        candidates = (1 << self.n) - 1
+        for v in bit_indices(clique):
+            candidates &= masks[v]
+
+        degrees = self.degree_list
+        while candidates:
+            vertices = bit_indices(candidates)
+            weights = scale_weights_list([degrees[v] for v in vertices], self.scaling_percent)
+            v = rng.choices(vertices, weights=weights, k=1)[0]
+            clique |= 1 << v
+            candidates &= masks[v]
+        return clique
+
+
+    def _extend_rows(self, cliques: np.ndarray, candidates: np.ndarray, rng: random.Random) -> None:
+        """Добавляет в клики по одной вершине за шаг для всех строк, у которых остались кандидаты"""
+        active = np.flatnonzero(candidates.any(axis=1))
+        while len(active):
+            cand = np.unpackbits(candidates[active], axis=1, count=self.n, bitorder='little').astype(bool)
+            cum_weights = np.cumsum(scale_weights(self.degrees, self.scaling_percent, cand), axis=1)
+
+            # Для каждой строки выбираем вершину так же, как rng.choices по списку кандидатов
+            targets = np.array([rng.random() for _ in active]) * cum_weights[:, -1]
+            chosen = (cum_weights <= targets[:, None]).sum(axis=1)
+            last = self.n - 1 - np.argmax(cand[:, ::-1], axis=1)
+            chosen = np.minimum(chosen, last)
+
+            cliques[active, chosen] = True
+            candidates[active] &= self.rows(chosen)
+            active = active[candidates[active].any(axis=1)]
@@ -0,0 +1,121 @@
+﻿"""
+Методы селекции родителей. Все функции возвращают номера выбранных особей,
+накопленные веса строятся один раз на поколение
+"""
+import random
+from bisect import bisect
+import numpy as np
+from typing import List, Sequence
+
+NUMPY_THRESHOLD = 1000      # Начиная с такого размера популяции рулетка считается на массивах NumPy
+SHORT_WEIGHTS = 128         # Списки весов до такой длины масштабируются без NumPy
+
+
+def scale_weights(weights, scaling_percent: float, candidates: np.ndarray = None) -> np.ndarray:
+    """
+    Масштабирует веса так, чтобы максимальный вес был не более чем на scaling_percent
+    больше минимального: 1 + K * (w - w_min) / (w_max - w_min), при равных весах - единицы.
+    Для матрицы масштабируется каждая строка. Если задана маска candidates, минимум
+    и максимум берутся по кандидатам строки, а вес не-кандидатов равен нулю
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if candidates is None:
+        w_min = weights.min(axis=-1, keepdims=True, initial=np.inf)
+        w_max = weights.max(axis=-1, keepdims=True, initial=-np.inf)
+    else:
+        w_min = np.where(candidates, weights, np.inf).min(axis=-1, keepdims=True, initial=np.inf)
+        w_max = np.where(candidates, weights, -np.inf).max(axis=-1, keepdims=True, initial=-np.inf)
+    spread = w_max - w_min
+    equal = spread == 0
+    spread[equal] = 1.0
+    K = scaling_percent / 100.0
+    scaled = np.where(equal, 1.0, 1 + K * (weights - w_min) / spread)
+    return scaled if candidates is None else np.where(candidates, scaled, 0.0)
+
+
+def scale_weights_list(weights: Sequence[float], scaling_percent: float) -> List[float]:
+    """
+    scale_weights для списка: короткие списки масштабируются без NumPy (преобразование
+    в массив и обратно дороже самих вычислений), результат тот же
+    """
+    if len(weights) > SHORT_WEIGHTS:
+        return scale_weights(weights, scaling_percent).tolist()
+    if not weights:
+        return []
+    w_min = min(weights)
+    spread = max(weights) - w_min
+    if spread == 0:
+        return [1.0] * len(weights)
+    K = scaling_percent / 100.0
+    return [1 + K * (w - w_min) / spread for w in weights]
+
+
+def roulette(cum_weights: Sequence[float], k: int, rng: random.Random) -> List[int]:
+    """Метод рулетки: k независимых выборов (совпадает с rng.choices)"""
+    total = cum_weights[-1]
+    hi = len(cum_weights) - 1
+    return [bisect(cum_weights, rng.random() * total, 0, hi) for _ in range(k)]
+
+
+def roulette_numpy(cum_weights: np.ndarray, k: int, np_rng: np.random.Generator) -> List[int]:
+    """Метод рулетки для больших популяций: все выборы одним вызовом searchsorted"""
+    idx = np.searchsorted(cum_weights, np_rng.random(k) * cum_weights[-1], side='right')
+    return np.minimum(idx, len(cum_weights) - 1).tolist()
+
+
+def stochastic_universal_sampling(cum_weights: Sequence[float], k: int, rng: random.Random) -> List[int]:
+    """
+    Стохастическая универсальная выборка: одно случайное число задает
+    k равноотстоящих указателей на колесе рулетки
+    """
+    total = cum_weights[-1]
+    hi = len(cum_weights) - 1
+    step = total / k
+    start = rng.random() * step
+    selected = []
+    idx = 0
+    for i in range(k):
+        pointer = start + i * step
+        # Указатели возрастают, поэтому поиск продолжается с предыдущей позиции
+        while idx < hi and cum_weights[idx] <= pointer:
+            idx += 1
+        selected.append(idx)
+
+    # Порядок родителей перемешивается, иначе пары составлялись бы из соседей по колесу
+    rng.shuffle(selected)
+    return selected
+
+
+def tournament(fitnesses: Sequence[float], k: int, size: int, rng: random.Random) -> List[int]:
+    """Турнирная селекция: победитель каждого турнира - лучшая из size случайных особей"""
+    n = len(fitnesses)
+    return [max((rng.randrange(n) for _ in range(size)), key=lambda i: fitnesses[i])
+            for _ in range(k)]
+
+
+def select_indices(fitnesses: Sequence[float], k: int, method: str, scaling_percent: float,
+                   rng: random.Random, tournament_size: int = 2,
+                   np_rng: np.random.Generator = None) -> List[int]:
+    """
+    Выбирает k номеров особей заданным методом селекции, случайные числа берутся из rng.
+    fitnesses - список или массив NumPy; рулетка для больших популяций берет числа из np_rng
+    (если он не задан, генератор NumPy создается с зерном из rng)
+    """
+    if len(fitnesses) == 0:
+        return []
+
+    if method == 'tournament':
+        return tournament(fitnesses, k, tournament_size, rng)
+
+    if method == 'roulette' and len(fitnesses) >= NUMPY_THRESHOLD:
+        weights = scale_weights(fitnesses, scaling_percent)
+        if np_rng is None:
+            np_rng = np.random.default_rng(rng.getrandbits(64))
+        return roulette_numpy(np.cumsum(weights), k, np_rng)
+
+    # Накопленные веса строятся один раз на поколение
+    cum_weights = np.cumsum(scale_weights(fitnesses, scaling_percent)).tolist()
+
+    if method == 'sus':
+        return stochastic_universal_sampling(cum_weights, k, rng)
+    return roulette(cum_weights, k, rng)
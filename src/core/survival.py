@@ -0,0 +1,96 @@
+﻿"""
+Отбор выживших для больших популяций: замещение с ограниченным турниром (RTR).
+Каждый потомок соперничает с ближайшей к нему особью популяции и занимает ее место,
+если не хуже. Ближайшая особь ищется не среди всех, а среди случайного окна
+и соседей по корзинам MinHash LSH, поэтому время поколения почти линейно по P
+"""
+import random
+from collections import Counter
+from itertools import islice
+import numpy as np
+from modules.bitset import bit_indices
+from typing import Dict, List, Set
+
+MINHASH_BANDS = 4           # Количество полос LSH (в каждой полосе своя корзина)
+MINHASH_ROWS = 3            # Количество значений MinHash в одной полосе
+MINHASH_PRIME = 2 ** 31 - 1 # Модуль универсального хеширования номеров вершин
+
+
+class RestrictedTournament:
+    """
+    Замещение с ограниченным турниром. Клики сравниваются по MinHash множеств вершин:
+    у клик с близостью Жаккара s совпадает полоса с вероятностью s^ROWS, поэтому похожие
+    клики почти всегда попадают хотя бы в одну общую корзину. Расстояние Хэмминга
+    считается только до кандидатов - особей окна и соседей по корзинам
+    """
+
+    def __init__(self, window: int, rng: random.Random):
+        self.window = window
+        self.rng = rng          # Генератор случайных чисел алгоритма
+        size = MINHASH_BANDS * MINHASH_ROWS
+        # Коэффициенты хеш-функций берутся из rng, поэтому зерно запуска задает и их
+        self.a = np.array([rng.randrange(1, MINHASH_PRIME) for _ in range(size)], dtype=np.int64)
+        self.b = np.array([rng.randrange(MINHASH_PRIME) for _ in range(size)], dtype=np.int64)
+
+
+    def band_keys(self, bits: int) -> List[tuple]:
+        """Ключи корзин клики: номер полосы и значения MinHash этой полосы"""
+        vertices = np.array(bit_indices(bits), dtype=np.int64)
+        if len(vertices) == 0:
+            return [(band,) for band in range(MINHASH_BANDS)]
+        signature = ((self.a[:, None] * vertices[None, :] + self.b[:, None]) % MINHASH_PRIME).min(axis=1).tolist()
+        return [(band,) + tuple(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])
+                for band in range(MINHASH_BANDS)]
+
+
+    def select(self, bits: List[int], fitness: List[int], offspring_count: int,
+               population_size: int, skip_duplicates: bool = False) -> List[int]:
+        """
+        Отбор выживших среди кандидатов (сначала offspring_count потомков, затем текущая популяция).
+        Потомки по очереди замещают ближайшую особь, если их приспособленность не меньше.
+        При skip_duplicates потомок, хромосома которого уже есть в популяции, пропускается.
+        Возвращает номера кандидатов новой популяции
+        """
+        members = list(range(offspring_count, len(bits)))   # Слоты популяции -> номера кандидатов
+        keys = {}                                           # Ключи корзин кандидатов (строятся по мере надобности)
+        buckets: Dict[tuple, Set[int]] = {}                 # Корзина -> слоты популяции
+        present = Counter(bits[i] for i in members)         # Хромосомы в популяции
+
+        def place(slot: int, index: int):
+            """Помещает кандидата index в слот и в корзины его ключей"""
+            if index not in keys:
+                keys[index] = self.band_keys(bits[index])
+            for key in keys[index]:
+                buckets.setdefault(key, set()).add(slot)
+
+        for slot, index in enumerate(members):
+            place(slot, index)
+
+        for child in range(offspring_count):
+            if skip_duplicates and present[bits[child]]:
+                continue
+            # Популяция меньше нужного размера: потомок добавляется без турнира
+            if len(members) < population_size:
+                members.append(child)
+                present[bits[child]] += 1
+                place(len(members) - 1, child)
+                continue
+
+            keys[child] = self.band_keys(bits[child])
+            candidates = set(self.rng.sample(range(len(members)), min(self.window, len(members))))
+            # Из большой корзины (популяция сошлась) берется не больше window соседей
+            for key in keys[child]:
+                candidates.update(islice(buckets.get(key, ()), self.window))
+
+            # Ближайшая особь (среди равноудаленных - с меньшим номером слота)
+            nearest = min(sorted(candidates), key=lambda slot: (bits[members[slot]] ^ bits[child]).bit_count())
+            old = members[nearest]
+            if fitness[child] >= fitness[old]:
+                for key in keys[old]:
+                    buckets[key].discard(nearest)
+                present[bits[old]] -= 1
+                members[nearest] = child
+                present[bits[child]] += 1
+                place(nearest, child)
+
+        return members
@@ -0,0 +1,55 @@
+﻿"""
+Вспомогательные функции для работы с битовыми масками вершин.
+Бит i маски соответствует гену i хромосомы (вершине i преобразованного графа).
+"""
+
+import numpy as np
+
+_TO_ASCII = bytes.maketrans(b'\x00\x01', b'01')      # Байты 0/1 -> символы '0'/'1'
+_FROM_ASCII = bytes.maketrans(b'01', b'\x00\x01')    # Символы '0'/'1' -> байты 0/1
+
+
+def to_mask(chromosome) -> int:
+    """Упаковывает бинарную хромосому (список 0/1) в целое число"""
+    if len(chromosome) == 0:
+        return 0
+    return int(bytes(chromosome)[::-1].translate(_TO_ASCII), 2)
+
+
+def from_mask(mask: int, n: int) -> list[int]:
+    """Распаковывает битовую маску в бинарную хромосому длины n"""
+    if n == 0:
+        return []
+    return list(format(mask, f'0{n}b')[::-1].encode().translate(_FROM_ASCII))
+
+
+def indices_to_mask(indices, n: int) -> int:
+    """Строит битовую маску по списку номеров вершин"""
+    row = bytearray(n)
+    for v in indices:
+        row[v] = 1
+    return to_mask(row)
+
+
+def segment_mask(points, n: int) -> int:
+    """
+    Маска чередующихся сегментов длины n по возрастающим точкам разрыва:
+    установлены биты [points[0], points[1]), [points[2], points[3]), ...
+    (при нечетном числе точек последний сегмент продолжается до конца)
+    """
+    # Каждая точка разрыва переключает сегмент: бит установлен при нечетном числе точек не правее него
+    toggles = np.zeros(n, dtype=np.uint8)
+    toggles[list(points)] = 1
+    packed = np.packbits(np.bitwise_xor.accumulate(toggles), bitorder='little')
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def bit_indices(mask: int) -> list[int]:
+    """Возвращает номера установленных битов маски в порядке возрастания"""
+    bits = bin(mask)[:1:-1]     # Двоичная запись от младшего бита к старшему
+    indices = []
+    i = bits.find('1')
+    while i >= 0:
+        indices.append(i)
+        i = bits.find('1', i + 1)
+    return indices
@@ -1,13 +1,43 @@
 ﻿import random
 import json
+from modules.bitset import to_mask, indices_to_mask, bit_indices
 
 class Graph:
-    def __init__(self, adj_list: list[set[int]]):
+    BACKENDS = ('sets', 'bitset')   # Доступные способы хранения преобразованного графа
+
+    def __init__(self, adj_list: list[set[int]], backend: str = 'sets'):
         self.adj_list: list[set[int]] = adj_list    # Граф до преобразования (список смежности)
         self.n: int = len(adj_list)                 # Количество вершин в графе
         self.transformed_adj: list[set[int]] = []   # Граф с переназначенными вершинами
+        self.transformed_bits: list[int] = []       # Соседи вершин преобразованного графа в виде битовых масок (без петель)
         self.old_to_new: list = []                  # Список для преобразования старых индексов в новые
         self.new_to_old: list = []                  # Список для преобразования новых индексов в старые
+        self.backend: str = 'sets'                  # Способ хранения: множества или битовые маски
+        self._upper_bound: int = None               # Верхняя граница размера клики (вычисляется один раз)
+        self._cores: tuple = None                   # Разложение на ядра (вычисляется один раз)
+        self.set_backend(backend)
+
+
+    def set_backend(self, backend: str) -> None:
+        """
+        Выбирает способ хранения преобразованного графа:
+        'sets' - множества соседей, 'bitset' - битовые маски соседей
+        """
+        if backend not in Graph.BACKENDS:
+            raise ValueError(f"Unknown graph backend: {backend}. Must be one of {', '.join(Graph.BACKENDS)}")
+        self.backend = backend
+        if backend == 'bitset' and self.transformed_adj and not self.transformed_bits:
+            self.transformed_bits = self._build_bits(self.transformed_adj)
+        elif backend == 'sets':
+            self.transformed_bits = []
+
+
+    def _build_bits(self, adj: list[set[int]]) -> list[int]:
+        """Строит битовые маски соседей по списку смежности (петли не учитываются)"""
+        bits = []
+        for v, neighbors in enumerate(adj):
+            bits.append(indices_to_mask((u for u in neighbors if u != v), self.n))
+        return bits
 
 
     @staticmethod
@@ -129,6 +159,105 @@ class Graph:
                 new_adj[new_u].add(new_v)
 
         self.transformed_adj = new_adj
+        self.transformed_bits = self._build_bits(new_adj) if self.backend == 'bitset' else []
+
+
+    def induced_subgraph(self, vertices: list[int]) -> 'Graph':
+        """Подграф преобразованного графа на вершинах vertices: вершина i подграфа - vertices[i]"""
+        index = {v: i for i, v in enumerate(vertices)}
+        adj = [{index[u] for u in self.transformed_adj[v] if u in index} for v in vertices]
+        return Graph(adj, self.backend)
+
+
+    def transformed_degrees(self) -> list[int]:
+        """Степени вершин преобразованного графа"""
+        return [len(adj) for adj in self.transformed_adj]
+
+
+    def core_decomposition(self) -> tuple[list[int], list[int]]:
+        """
+        Разложение на ядра (алгоритм Батагеля-Заверсника за O(n + m)).
+        Возвращает ядерные числа вершин и порядок удаления вершин (по неубыванию ядерного числа)
+        """
+        if self._cores is not None:
+            return self._cores
+        n = self.n
+        degree = [len(neighbors) - (v in neighbors) for v, neighbors in enumerate(self.adj_list)]
+        max_degree = max(degree, default=0)
+
+        # Вершины сортируются по степени подсчетом; start[d] - начало корзины степени d
+        start = [0] * (max_degree + 2)
+        for d in degree:
+            start[d + 1] += 1
+        for d in range(max_degree + 1):
+            start[d + 1] += start[d]
+        position = [0] * n
+        order = [0] * n
+        for v in range(n):
+            position[v] = start[degree[v]]
+            order[position[v]] = v
+            start[degree[v]] += 1
+        for d in range(max_degree, 0, -1):
+            start[d] = start[d - 1]
+        start[0] = 0
+
+        # Вершина с наименьшей степенью удаляется, степени ее соседей уменьшаются
+        for i in range(n):
+            v = order[i]
+            for u in self.adj_list[v]:
+                if degree[u] > degree[v]:
+                    du = degree[u]
+                    pu = position[u]
+                    pw = start[du]
+                    w = order[pw]
+                    if u != w:      # u переставляется в начало своей корзины
+                        position[u], position[w] = pw, pu
+                        order[pu], order[pw] = w, u
+                    start[du] += 1
+                    degree[u] -= 1
+        self._cores = (degree, order)
+        return self._cores
+
+
+    def colouring_bound(self, order: list[int]) -> int:
+        """
+        Количество цветов жадной раскраски вершин в заданном порядке.
+        Цветовые классы хранятся множествами: вершина получает первый класс без ее соседей,
+        а проверка класса прекращается на первом же общем соседе
+        """
+        classes = []
+        for v in order:
+            neighbors = self.adj_list[v]
+            for members in classes:
+                if members.isdisjoint(neighbors):
+                    members.add(v)
+                    break
+            else:
+                classes.append({v})
+        return len(classes)
+
+
+    def clique_upper_bound(self) -> int:
+        """
+        Верхняя граница размера клики - наименьшая из границ: максимальная степень + 1,
+        вырожденность + 1 и число цветов жадной раскраски в порядке, обратном
+        порядку удаления вершин при разложении на ядра. Вычисляется один раз: разложение на ядра
+        занимает O(n + m), жадная раскраска - O(n + k * m) в худшем случае, где k - число цветов
+        (каждая вершина проверяется не более чем с k классами)
+        """
+        if self._upper_bound is None:
+            core, removal_order = self.core_decomposition()
+            max_degree = max((len(neighbors) - (v in neighbors) for v, neighbors in enumerate(self.adj_list)),
+                             default=-1)
+            self._upper_bound = min(max_degree + 1,
+                                    max(core, default=-1) + 1,
+                                    self.colouring_bound(removal_order[::-1]))
+        return self._upper_bound
+
+
+    def is_transformed(self) -> bool:
+        """Проверяет, построен ли уже преобразованный по степеням граф"""
+        return len(self.transformed_adj) == self.n and len(self.new_to_old) == self.n
 
 
     def transform_to_original(self, sorted_chromosome: list[int]) -> list[int]:
@@ -143,6 +272,14 @@ class Graph:
         return original_chromosome
 
 
+    def vertices_to_original(self, vertices) -> list[int]:
+        """Строит хромосому в исходной нумерации по номерам вершин преобразованного графа"""
+        original_chromosome = [0] * self.n
+        for v in vertices:
+            original_chromosome[self.new_to_old[v]] = 1
+        return original_chromosome
+
+
     def transform_to_sorted(self, original_chromosome: list[int]) -> list[int]:
         """Преобразует хромосому из исходной нумерации в преобразованную"""
         sorted_chromosome = [0] * self.n
@@ -179,8 +316,33 @@ class Graph:
         return v in self.transformed_adj[u]
 
 
+    def neighbor_test(self, v: int):
+        """Возвращает функцию, проверяющую, смежна ли вершина u с вершиной v"""
+        return self.transformed_adj[v].__contains__
+
+
+    def common_neighbors(self, vertices: list[int], candidates=None) -> set[int]:
+        """
+        Вершины, смежные всем вершинам vertices (среди candidates, если они заданы).
+        Без candidates список vertices не должен быть пустым
+        """
+        vertices = list(vertices)
+        if candidates is None:
+            candidates = self.transformed_adj[vertices[0]]
+            vertices = vertices[1:]
+        result = set(candidates)
+        for v in vertices:
+            result &= self.transformed_adj[v]
+        return result
+
+
     def degree_in_subgraph(self, included: list[int]):
         """Вычисляет степени вершин в подграфе (в преобразованном графе)"""
+        if self.transformed_bits:
+            # Степень вершины - количество битов в пересечении ее соседей с подграфом
+            mask = indices_to_mask(included, self.n)
+            return [(self.transformed_bits[v] & mask).bit_count() for v in included]
+
         degs = []
         for v in included:
             deg = 0
@@ -194,6 +356,9 @@ class Graph:
 
     def is_clique(self, chromosome: list[int]) -> bool:
         """Проверяет, задают ли включенные в хромосому вершины клику в преобразованном графе"""
+        if self.transformed_bits:
+            return self.is_clique_mask(to_mask(chromosome))
+
         included = [v for v, flag in enumerate(chromosome) if flag]
         k = len(included)
         if k <= 1:
@@ -210,28 +375,70 @@ class Graph:
         return True
 
 
-    def repair_chromosome(self, chromosome: list[int]) -> list[int]:
+    def is_clique_mask(self, mask: int) -> bool:
+        """Проверяет, задает ли битовая маска вершин клику (требуется бэкенд 'bitset')"""
+        k = mask.bit_count()
+        if k <= 1:
+            return True
+
+        # Каждая вершина клики смежна со всеми остальными ее вершинами
+        for v in bit_indices(mask):
+            if (self.transformed_bits[v] & mask).bit_count() != k - 1:
+                return False
+
+        return True
+
+
+    def repair_chromosome(self, chromosome: list[int], rng: random.Random = None) -> list[int]:
         """
         Пока включенные вершины не образуют клику,
         удаляет случайную вершину минимальной степени в подграфе
         Возвращает новую хромосому
         """
         chrom = chromosome.copy()
-        while not self.is_clique(chrom):
-            # Включенные в рассматриваемый подграф вершины
-            included = [v for v, flag in enumerate(chrom) if flag]
-            degs = self.degree_in_subgraph(included)
+        included = [v for v, flag in enumerate(chrom) if flag]
+        for v in self.vertices_to_remove(included, rng=rng):
+            chrom[v] = 0
 
-            # Находим вершины с минимальной степенью
-            min_deg = min(degs)
-            candidate_idxs = [i for i, d in enumerate(degs) if d == min_deg]
+        return chrom
 
-            # Случайно выбираем из этих вершин одну и удаляем ее из подграфа
-            idx_to_remove = random.choice(candidate_idxs)
-            v_to_remove = included[idx_to_remove]
-            chrom[v_to_remove] = 0
 
-        return chrom
+    def vertices_to_remove(self, included: list[int], ties: list[int] = None,
+                           rng: random.Random = None) -> list[int]:
+        """
+        Возвращает вершины, которые repair_chromosome удаляет из подграфа,
+        в порядке удаления. Степени вершин подграфа вычисляются один раз,
+        а при удалении вершины уменьшаются только степени ее соседей.
+        Если передан список ties, в него добавляется число вершин минимальной степени на каждом шаге.
+        Среди равных вершина выбирается генератором rng (без него - модулем random)
+        """
+        rng = rng or random
+        included = list(included)
+        degs = self.degree_in_subgraph(included)
+        removed = []
+
+        while included:
+            # Подграф - клика, если каждая вершина смежна со всеми остальными
+            min_deg = min(degs)
+            if min_deg == len(included) - 1:
+                break
+
+            # Случайно выбираем одну из вершин минимальной степени и удаляем ее из подграфа
+            candidate_idxs = [i for i, d in enumerate(degs) if d == min_deg]
+            if ties is not None:
+                ties.append(len(candidate_idxs))
+            idx_to_remove = rng.choice(candidate_idxs)
+            v_to_remove = included.pop(idx_to_remove)
+            degs.pop(idx_to_remove)
+            removed.append(v_to_remove)
+
+            # Уменьшаем степени соседей удаленной вершины
+            is_neighbor = self.neighbor_test(v_to_remove)
+            for i, u in enumerate(included):
+                if is_neighbor(u):
+                    degs[i] -= 1
+
+        return removed
     
 
 
@@ -6,19 +6,21 @@ class History:
     def __init__(self):
         self.best_fitness: list[float] = []         # Лучшие приспособленности на каждом поколении
         self.avg_fitness: list[float] = []          # Средние приспособленности на каждом поколении
+        self.duplicate_rate: list[float] = []       # Доли повторяющихся хромосом на каждом поколении
 
 
     def record(self, population: Population):
-        """Пересчитывает параметры популяции и сохраняет их в историю"""
-        population.update_stats()
+        """Сохраняет в историю статистики популяции (популяция поддерживает их сама)"""
         self.best_fitness.append(population.best.fitness)
         self.avg_fitness.append(population.avg_fitness)
+        self.duplicate_rate.append(population.duplicate_rate)
 
     def save_to_json(self, path: str):
         """Сохраняет историю работы алгоритма в результирующий json-файл"""
         data = {
             'best_fitness': self.best_fitness,
-            'avg_fitness': self.avg_fitness
+            'avg_fitness': self.avg_fitness,
+            'duplicate_rate': self.duplicate_rate
         }
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2)
@@ -1,11 +1,143 @@
-﻿class Individual:
+﻿from modules.bitset import to_mask, from_mask, bit_indices
+
+class Individual:
+    __slots__ = ('_bits', 'n', '_fitness', '_valid')
+
     def __init__(self, chromosome: list[int]):
-        self.chromosome = chromosome    # Бинарный вектор, задающий хромосому
-        self.fitness: float = 0         # Размер клики
+        self.n: int = len(chromosome)           # Длина хромосомы
+        self._bits: int = to_mask(chromosome)   # Бинарный вектор хромосомы, упакованный в целое число
+        self._fitness: int = 0                  # Размер клики
+        self._valid: bool = False               # Актуальна ли сохраненная приспособленность
+        self.evaluate()
+
+
+    @classmethod
+    def from_bits(cls, bits: int, n: int) -> 'Individual':
+        """Создает особь по битовой маске хромосомы длины n"""
+        ind = cls.__new__(cls)
+        ind.n = n
+        ind.bits = bits     # Сеттер сбрасывает сохраненную приспособленность
+        ind.evaluate()
+        return ind
+
+
+    @property
+    def bits(self) -> int:
+        """Битовая маска хромосомы"""
+        return self._bits
+
+
+    @bits.setter
+    def bits(self, bits: int):
+        self._bits = bits
+        self.invalidate()
+
+
+    @property
+    def chromosome(self) -> list[int]:
+        """Хромосома в виде списка 0/1 (распаковывается при каждом обращении)"""
+        return from_mask(self.bits, self.n)
+
+
+    @chromosome.setter
+    def chromosome(self, chromosome: list[int]):
+        self.n = len(chromosome)
+        self.bits = to_mask(chromosome)
+
+
+    @property
+    def vertices(self) -> list[int]:
+        """Номера включенных вершин по возрастанию"""
+        return bit_indices(self.bits)
+
+
+    @property
+    def key(self):
+        """Хешируемый ключ хромосомы: у одинаковых хромосом ключи равны"""
+        return self.bits
+
+
+    @property
+    def fitness(self) -> int:
+        """Приспособленность, пересчитывается только после изменения хромосомы"""
+        return self._fitness if self._valid else self.evaluate()
+
+
+    def invalidate(self):
+        """Помечает сохраненную приспособленность как устаревшую"""
+        self._valid = False
 
 
     def evaluate(self):
         """Вычисление приспособленности как размера клики,
         считая, что заданная хромосома всегда задает клику"""
-        self.fitness = sum(int(i) for i in self.chromosome)
-        return self.fitness
\ No newline at end of file
+        if not self._valid:
+            self._fitness = self.bits.bit_count()
+            self._valid = True
+        return self._fitness
+
+
+class SparseIndividual(Individual):
+    """
+    Особь, хранящая хромосому как упорядоченный кортеж номеров включенных вершин.
+    Память и операции зависят от размера клики, а не от числа вершин графа;
+    битовая маска и список 0/1 строятся только при обращении
+    """
+    __slots__ = ('_vertices',)
+
+    def __init__(self, vertices, n: int):
+        self.n: int = n                                 # Длина хромосомы
+        self._vertices: tuple = tuple(sorted(vertices)) # Номера включенных вершин
+        self._fitness: int = len(self._vertices)
+        self._valid: bool = True
+
+
+    @property
+    def vertices(self) -> tuple:
+        """Номера включенных вершин по возрастанию"""
+        return self._vertices
+
+
+    @property
+    def key(self) -> tuple:
+        """Ключ хромосомы - кортеж номеров вершин (маска не строится)"""
+        return self._vertices
+
+
+    @property
+    def bits(self) -> int:
+        """Битовая маска хромосомы (строится при каждом обращении)"""
+        bits = 0
+        for v in self._vertices:
+            bits |= 1 << v
+        return bits
+
+
+    @bits.setter
+    def bits(self, bits: int):
+        self._vertices = tuple(bit_indices(bits))
+        self.invalidate()
+
+
+    @property
+    def chromosome(self) -> list[int]:
+        """Хромосома в виде списка 0/1"""
+        chromosome = [0] * self.n
+        for v in self._vertices:
+            chromosome[v] = 1
+        return chromosome
+
+
+    @chromosome.setter
+    def chromosome(self, chromosome: list[int]):
+        self.n = len(chromosome)
+        self._vertices = tuple(v for v, gene in enumerate(chromosome) if gene)
+        self.invalidate()
+
+
+    def evaluate(self):
+        """Приспособленность - количество включенных вершин"""
+        if not self._valid:
+            self._fitness = len(self._vertices)
+            self._valid = True
+        return self._fitness
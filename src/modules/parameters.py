@@ -1,4 +1,9 @@
-﻿class Parameters:
+﻿import copy
+import random
+from typing import Optional
+
+
+class Parameters:
     def __init__(
         self,
         population_size: int,           # Размер популяции
@@ -10,6 +15,35 @@
         max_crossover_points: int,      # Максимальное количество точек разреза
         decrease_percent: int,        # Процент уменьшения вероятности мутации и точек разреза
         decrease_step: int,             # Шаг (количество поколений) уменьшения точек разреза, вероятности мутации гена и хромосомы
+        graph_backend: str = 'sets',    # Способ хранения графа: 'sets' (множества) или 'bitset' (битовые маски)
+        engine: str = 'python',         # Реализация алгоритма: 'python' (списки), 'numpy' (матрица популяции) или 'exact' (точный поиск)
+        selection_method: str = 'roulette', # Селекция родителей: 'roulette', 'sus' (стохастическая универсальная) или 'tournament'
+        tournament_size: int = 2,       # Количество участников турнира при турнирной селекции
+        parallel_workers: int = 0,      # Количество процессов для получения потомков (0 - без параллелизма)
+        seed: int = None,               # Зерно генератора случайных чисел (None - случайный запуск)
+        island_count: int = 0,          # Количество островов в отдельных процессах (0 - один алгоритм)
+        migration_interval: int = 10,   # Через сколько поколений острова обмениваются особями
+        migration_size: int = 2,        # Сколько лучших особей остров отправляет соседу
+        migration_topology: str = 'ring',   # Топология миграции: 'ring' (кольцо) или 'random'
+        portfolio_solvers: int = 4,     # Количество параллельных решателей в режиме гонки
+        portfolio_deadline: float = 60.0,   # Ограничение времени гонки решателей (в секундах)
+        exact_step_nodes: int = 1000,   # Количество узлов дерева поиска за один шаг точного решателя
+        exact_node_limit: int = 0,      # Ограничение числа узлов точного решателя (0 - без ограничения)
+        exact_time_limit: float = 0.0,  # Ограничение времени точного решателя в секундах (0 - без ограничения)
+        core_pruning: bool = False,     # Удалять из рабочего графа вершины, которые не входят в клику больше лучшей
+        greedy_extension: bool = False, # Дополнять восстановленных потомков до максимальных клик
+        local_search_elite: int = 0,    # Сколько лучших потомков улучшать локальным поиском (0 - без локального поиска)
+        local_search_moves: int = 100,  # Бюджет ходов локального поиска на одно поколение
+        local_search_tabu: int = 7,     # Сколько ходов удаленная вершина не может вернуться в клику
+        crossover_method: str = 'multipoint',   # Кроссовер: 'multipoint' (точки разрыва), 'intersection' (общие вершины) или 'union' (объединение)
+        mutation_method: str = 'uniform',   # Мутация: 'uniform' (независимые гены) или 'neighbourhood' (с учетом соседства клики)
+        chromosome_mode: str = 'dense',     # Хромосомы: 'dense' (списки 0/1) или 'sparse' (номера вершин, для очень больших графов)
+        crossover_buffers: bool = False,    # Переиспользовать матрицы родителей, масок и потомков между поколениями (движок numpy)
+        deduplicate: bool = False,      # Исключать повторяющиеся хромосомы из отбора выживших
+        repair_cache_size: int = 0,     # Емкость LRU-кэша восстановления немутировавших потомков (0 - без кэша)
+        repair_cache_ties: str = 'deterministic',   # Что кэшировать: 'deterministic' (без случайного выбора) или 'reuse' (любой результат)
+        survival_method: str = 'maxmin',    # Отбор выживших: 'maxmin' (максимум минимального расстояния) или 'rtr' (ограниченный турнир, для больших популяций)
+        rtr_window: int = 16,           # Размер случайного окна поиска ближайшей особи в режиме 'rtr'
     ):
         self.population_size = population_size
         self.max_generations = max_generations
@@ -20,6 +54,53 @@
         self.max_crossover_points = max_crossover_points
         self.decrease_percent = decrease_percent
         self.decrease_step = decrease_step
+        self.graph_backend = graph_backend
+        self.engine = engine
+        self.selection_method = selection_method
+        self.tournament_size = tournament_size
+        self.parallel_workers = parallel_workers
+        self.seed = seed
+        self.island_count = island_count
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.migration_topology = migration_topology
+        self.portfolio_solvers = portfolio_solvers
+        self.portfolio_deadline = portfolio_deadline
+        self.exact_step_nodes = exact_step_nodes
+        self.exact_node_limit = exact_node_limit
+        self.exact_time_limit = exact_time_limit
+        self.core_pruning = core_pruning
+        self.greedy_extension = greedy_extension
+        self.local_search_elite = local_search_elite
+        self.local_search_moves = local_search_moves
+        self.local_search_tabu = local_search_tabu
+        self.crossover_method = crossover_method
+        self.mutation_method = mutation_method
+        self.chromosome_mode = chromosome_mode
+        self.crossover_buffers = crossover_buffers
+        self.deduplicate = deduplicate
+        self.repair_cache_size = repair_cache_size
+        self.repair_cache_ties = repair_cache_ties
+        self.survival_method = survival_method
+        self.rtr_window = rtr_window
+
+    def process_variant(self, mutation_factor: float, seed: Optional[int]) -> 'Parameters':
+        """
+        Копия параметров для отдельного процесса (острова или решателя гонки): вероятности
+        мутации умножаются на mutation_factor (не больше 1), зерно - seed, внутри процесса
+        нет ни островов, ни пула процессов
+        """
+        variant = copy.copy(self)
+        variant.max_mutation_prob_gene = min(1.0, self.max_mutation_prob_gene * mutation_factor)
+        variant.max_mutation_prob_chrom = min(1.0, self.max_mutation_prob_chrom * mutation_factor)
+        variant.seed = seed
+        variant.island_count = 0
+        variant.parallel_workers = 0
+        return variant
+
+    def process_seed(self, index: int) -> int:
+        """Зерно процесса index: без заданного зерна каждый процесс получает свое, иначе процессы повторили бы друг друга"""
+        return random.getrandbits(32) if self.seed is None else self.seed + index
 
     @classmethod
     def from_graph(self, n: int) -> 'Parameters':
@@ -105,6 +186,81 @@
                     if not (0 <= value < 100):
                         raise ValueError(f"Parameter '{key}': must be between 0 and 100, got {value}")
 
+        # Необязательные параметры с фиксированным набором значений
+        optional_choices: dict[str, tuple] = {
+            'graph_backend': ('sets', 'bitset'),
+            'engine': ('python', 'numpy', 'exact'),
+            'selection_method': ('roulette', 'sus', 'tournament'),
+            'migration_topology': ('ring', 'random'),
+            'crossover_method': ('multipoint', 'intersection', 'union'),
+            'mutation_method': ('uniform', 'neighbourhood'),
+            'chromosome_mode': ('dense', 'sparse'),
+            'repair_cache_ties': ('deterministic', 'reuse'),
+            'survival_method': ('maxmin', 'rtr'),
+        }
+
+        for key, choices in optional_choices.items():
+            if key in data and data[key] not in choices:
+                raise ValueError(f"Parameter '{key}': must be one of {', '.join(choices)}, got {data[key]}")
+
+        # Необязательные целочисленные параметры и их минимальные значения
+        optional_ints: dict[str, int] = {
+            'tournament_size': 1,
+            'parallel_workers': 0,
+            'island_count': 0,
+            'migration_interval': 1,
+            'migration_size': 0,
+            'portfolio_solvers': 1,
+            'exact_step_nodes': 1,
+            'exact_node_limit': 0,
+            'local_search_elite': 0,
+            'local_search_moves': 1,
+            'local_search_tabu': 0,
+            'repair_cache_size': 0,
+            'rtr_window': 1,
+        }
+
+        for key, min_value in optional_ints.items():
+            if key in data:
+                value = data[key]
+                if not isinstance(value, int):
+                    raise ValueError(f"Wrong type. Parameter '{key}': must be int")
+                if value < min_value:
+                    raise ValueError(f"Parameter '{key}': must be >= {min_value}, got {value}")
+
+        # Необязательные логические параметры
+        optional_bools: tuple = ('core_pruning', 'greedy_extension', 'crossover_buffers', 'deduplicate')
+
+        for key in optional_bools:
+            if key in data and not isinstance(data[key], bool):
+                raise ValueError(f"Wrong type. Parameter '{key}': must be bool")
+
+        if data.get('seed') is not None and not isinstance(data['seed'], int):
+            raise ValueError("Wrong type. Parameter 'seed': must be int")
+
+        if 'portfolio_deadline' in data:
+            value = data['portfolio_deadline']
+            if not isinstance(value, (int, float)):
+                raise ValueError("Wrong type. Parameter 'portfolio_deadline': must be float")
+            if not (value > 0):
+                raise ValueError(f"Parameter 'portfolio_deadline': must be > 0, got {value}")
+
+        if 'exact_time_limit' in data:
+            value = data['exact_time_limit']
+            if not isinstance(value, (int, float)):
+                raise ValueError("Wrong type. Parameter 'exact_time_limit': must be float")
+            if value < 0:
+                raise ValueError(f"Parameter 'exact_time_limit': must be >= 0, got {value}")
+
+        # Процессы пула не разделяют кэш восстановления (у движка numpy пула нет)
+        if (data.get('repair_cache_size', 0) > 0 and data.get('parallel_workers', 0) > 0 and
+                data.get('engine', 'python') != 'numpy'):
+            raise ValueError("Parameter 'repair_cache_size' can't be used with 'parallel_workers'")
+
+        # Движок numpy хранит популяцию матрицей P x n (байт на ген), номеров вершин у него нет
+        if data.get('engine', 'python') == 'numpy' and data.get('chromosome_mode', 'dense') == 'sparse':
+            raise ValueError("Parameter 'chromosome_mode' = 'sparse' can't be used with 'engine' = 'numpy'")
+
 
 #if __name__ == '__main__':
 #    par = Parameters.load_parameters_from_json("params.json")
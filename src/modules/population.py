@@ -5,20 +5,30 @@ class Population:
         self.individuals = individuals      # Список особей
         self.best: Individual = None        # Лучшая особь в популяции
         self.avg_fitness: float = 0.0       # Средняя приспособленность
+        self.fitness_sum: float = 0         # Суммарная приспособленность
+        self.duplicate_rate: float = 0.0    # Доля повторов среди кандидатов, из которых отобрана популяция
         self.update_stats()                 # Инициализация параметров
 
 
     def update_stats(self):
-        """Пересчитывает статистики популяции"""
-        if not self.individuals:
-            self.best = None
-            self.avg_fitness = 0.0
-            return
-
-        # Обновляем и получаем значения приспособленности для всех особей
-        fitnesses = [ind.evaluate() for ind in self.individuals]
-        self.avg_fitness = sum(fitnesses) / len(fitnesses)
-        self.best = max(self.individuals, key=lambda ind: ind.fitness)
+        """
+        Пересчитывает статистики популяции с нуля.
+        Нужен только если особи были изменены извне: конструктор
+        и add_individuals поддерживают статистики сами
+        """
+        self.best = None
+        self.fitness_sum = 0
+        self._include(self.individuals)
+
+
+    def _include(self, individuals: list[Individual]):
+        """Учитывает приспособленности новых особей в статистиках популяции"""
+        for ind in individuals:
+            fitness = ind.evaluate()    # Приспособленность особи вычисляется один раз и кэшируется
+            self.fitness_sum += fitness
+            if self.best is None or fitness > self.best.fitness:
+                self.best = ind
+        self.avg_fitness = self.fitness_sum / len(self.individuals) if self.individuals else 0.0
 
 
     def select_best(self, n: int) -> list[Individual]:
@@ -35,4 +45,4 @@ class Population:
     def add_individuals(self, new_individuals: list[Individual]):
         """Добавляет новых особей в популяцию"""
         self.individuals.extend(new_individuals)
-        self.update_stats()
\ No newline at end of file
+        self._include(new_individuals)
\ No newline at end of file
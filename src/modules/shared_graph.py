@@ -0,0 +1,221 @@
+﻿import weakref
+import numpy as np
+from multiprocessing import shared_memory
+from modules.graph import Graph
+from modules.bitset import indices_to_mask
+
+
+def _layout(n: int) -> dict:
+    """Смещения массивов в блоке общей памяти (выровнены по 8 байт)"""
+    row_bytes = (n + 7) // 8
+    offsets = {}
+    offset = 0
+    for name, size in (('neighbors', n * row_bytes), ('loops', n),
+                       ('degrees', 8 * n), ('old_to_new', 8 * n), ('new_to_old', 8 * n)):
+        offsets[name] = offset
+        offset += (size + 7) // 8 * 8
+    offsets['size'] = max(offset, 1)
+    return offsets
+
+
+class SharedGraph:
+    """
+    Публикует преобразованный граф в multiprocessing.shared_memory:
+    упакованные строки смежности (без петель), петли, степени и old_to_new/new_to_old.
+    Процессы-исполнители подключаются к блоку по handle и получают SharedGraphView без копирования
+    """
+
+    def __init__(self, graph: Graph):
+        if not graph.is_transformed():
+            graph.transform_by_degree()
+        n = graph.n
+        layout = _layout(n)
+        self.shm = shared_memory.SharedMemory(create=True, size=layout['size'])
+        self.handle = (self.shm.name, n, graph.clique_upper_bound())   # Все, что нужно процессу для подключения
+
+        # Заполнение блока; временные массивы удаляются, чтобы блок можно было закрыть
+        neighbors, loops, degrees, old_to_new, new_to_old = _arrays(self.shm.buf, n, layout)
+        row = np.zeros(n, dtype=bool)
+        for v, adj in enumerate(graph.transformed_adj):
+            row[:] = False
+            row[list(adj)] = True
+            loops[v] = row[v]
+            row[v] = False
+            neighbors[v] = np.packbits(row, bitorder='little')
+            degrees[v] = len(adj)
+        old_to_new[:] = graph.old_to_new
+        new_to_old[:] = graph.new_to_old
+        del neighbors, loops, degrees, old_to_new, new_to_old
+
+        # Блок освобождается и при сборке мусора, если close() не был вызван
+        self._finalizer = weakref.finalize(self, SharedGraph._release, self.shm)
+
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory):
+        """Закрывает и удаляет блок общей памяти"""
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+    @staticmethod
+    def attach(handle: tuple, backend: str = 'sets') -> 'SharedGraphView':
+        """Подключается к опубликованному графу (в процессе-исполнителе)"""
+        return SharedGraphView(handle, backend)
+
+
+    def close(self):
+        """Освобождает блок общей памяти"""
+        self._finalizer()
+
+
+def _arrays(buf, n: int, layout: dict) -> tuple:
+    """Массивы NumPy поверх буфера общей памяти"""
+    row_bytes = (n + 7) // 8
+    return (np.ndarray((n, row_bytes), dtype=np.uint8, buffer=buf, offset=layout['neighbors']),
+            np.ndarray(n, dtype=bool, buffer=buf, offset=layout['loops']),
+            np.ndarray(n, dtype=np.int64, buffer=buf, offset=layout['degrees']),
+            np.ndarray(n, dtype=np.int64, buffer=buf, offset=layout['old_to_new']),
+            np.ndarray(n, dtype=np.int64, buffer=buf, offset=layout['new_to_old']))
+
+
+class _SharedRows:
+    """
+    Строки преобразованного графа из общей памяти. Маски распаковываются при первом обращении
+    и сохраняются в процессе (всего около n^2/8 байт). Множества соседей занимали бы в десятки
+    раз больше, поэтому распаковываются при каждом обращении - их читают только редкие операции
+    """
+
+    def __init__(self, view: 'SharedGraphView', as_masks: bool):
+        self.view = view
+        self.as_masks = as_masks
+        self.rows = [None] * view.n if as_masks else None   # Распакованные маски (None - еще не читалась)
+
+    def __len__(self):
+        return self.view.n
+
+    def __getitem__(self, v: int):
+        if not self.as_masks:
+            return self._decode(v)
+        row = self.rows[v]
+        if row is None:
+            row = self.rows[v] = self._decode(v)
+        return row
+
+    def _decode(self, v: int):
+        """Распаковывает строку v из общей памяти"""
+        row = self.view.packed_neighbors[v]
+        if self.as_masks:
+            return int.from_bytes(row.tobytes(), 'little')
+        neighbors = set(np.flatnonzero(np.unpackbits(row, count=self.view.n, bitorder='little')).tolist())
+        if self.view.loops[v]:
+            neighbors.add(v)
+        return neighbors
+
+    def __iter__(self):
+        for v in range(self.view.n):
+            yield self[v]
+
+
+class _OriginalRows:
+    """Список смежности в исходной нумерации, вычисляемый из преобразованного графа"""
+
+    def __init__(self, view: 'SharedGraphView'):
+        self.view = view
+
+    def __len__(self):
+        return self.view.n
+
+    def __getitem__(self, u: int):
+        new_to_old = self.view.new_to_old
+        return {int(new_to_old[v]) for v in self.view.transformed_adj[int(self.view.old_to_new[u])]}
+
+    def __iter__(self):
+        for u in range(self.view.n):
+            yield self[u]
+
+
+class SharedGraphView(Graph):
+    """
+    Граф, совместимый с Graph, поверх блока общей памяти. Доступен только для чтения:
+    в процессе сохраняются только строки-маски. Степени в подграфе считаются по маскам,
+    а отдельные ребра (восстановление, общие соседи) проверяются прямо в упакованных строках.
+    Маски распаковываются по мере обращения к строкам, поэтому каждый процесс-исполнитель
+    держит свою копию смежности - до n^2/8 байт (около 1.1 МБ при n = 3000) сверх общего блока.
+    DegreeSampler использует эти же маски, второй копии не строится
+    """
+
+    def __init__(self, handle: tuple, backend: str = 'sets'):
+        name, n, upper_bound = handle
+        # Процессы-исполнители используют трекер ресурсов основного процесса,
+        # поэтому блок удаляется один раз - владельцем при SharedGraph.close()
+        self.shm = shared_memory.SharedMemory(name=name)
+
+        self.n = n
+        self._upper_bound = upper_bound     # Граница вычислена владельцем по исходному графу
+        self._cores = None
+        (self.packed_neighbors, self.loops, self.degrees,
+         self.old_to_new, self.new_to_old) = _arrays(self.shm.buf, n, _layout(n))
+        self.transformed_adj = _SharedRows(self, as_masks=False)
+        self.row_masks = _SharedRows(self, as_masks=True)     # Соседи вершин в виде масок при любом способе чтения
+        self.row_bytes = (n + 7) // 8                           # Длина упакованной строки
+        self.packed = memoryview(self.packed_neighbors.reshape(-1))   # Упакованные строки подряд (без копирования)
+        self.adj_list = _OriginalRows(self)
+        self.transformed_bits = []
+        self.backend = 'sets'
+        self.set_backend(backend)
+
+
+    def set_backend(self, backend: str) -> None:
+        """Выбирает способ чтения строк: множества или битовые маски"""
+        if backend not in Graph.BACKENDS:
+            raise ValueError(f"Unknown graph backend: {backend}. Must be one of {', '.join(Graph.BACKENDS)}")
+        self.backend = backend
+        self.transformed_bits = self.row_masks if backend == 'bitset' else []
+
+
+    def transform_by_degree(self):
+        """Опубликованный граф уже преобразован"""
+
+
+    def transformed_degrees(self) -> list[int]:
+        """Степени вершин преобразованного графа"""
+        return self.degrees.tolist()
+
+
+    def has_edge(self, u: int, v: int) -> bool:
+        """Проверяет наличие ребра между u и v в преобразованном графе"""
+        if u == v:
+            return bool(self.loops[u])
+        return self.packed[u * self.row_bytes + (v >> 3)] >> (v & 7) & 1 == 1
+
+
+    def neighbor_test(self, v: int):
+        """Смежность с вершиной v проверяется прямо в ее упакованной строке"""
+        packed = self.packed
+        start = v * self.row_bytes
+        return lambda u: packed[start + (u >> 3)] >> (u & 7) & 1 == 1
+
+
+    def common_neighbors(self, vertices: list[int], candidates=None) -> set[int]:
+        """Общие соседи по упакованным строкам: строка первой вершины распаковывается без сохранения"""
+        vertices = list(vertices)
+        if candidates is None:
+            candidates = self.transformed_adj[vertices[0]]
+            vertices = vertices[1:]
+        packed = self.packed
+        result = set(candidates)
+        for v in vertices:
+            start = v * self.row_bytes
+            result = {u for u in result if packed[start + (u >> 3)] >> (u & 7) & 1}
+        return result
+
+
+    def degree_in_subgraph(self, included: list[int]):
+        """Степень вершины - количество битов в пересечении ее маски соседей с подграфом"""
+        mask = indices_to_mask(included, self.n)
+        masks = self.row_masks
+        return [(masks[v] & mask).bit_count() for v in included]